@@ -32,6 +32,15 @@ class Quux3Generator(CustomGenerator):
     bb = SelectMultiple(Lookup(SelectOne(['A', 'B', 'C', 'D', 'E', 'F', 'G']), mapping), num=Integer(1, 5))
 
 
+def make_wide_custom_generator(num_fields):
+    """
+    Return a custom generator instance with `num_fields` integer fields.
+    """
+    field_gens = {f'field_{i:03d}': Integer(0, 1000) for i in range(num_fields)}
+    WideGenerator = type('WideGenerator', (CustomGenerator,), field_gens)
+    return WideGenerator()
+
+
 class TimeBasicCustomGenerator:
 
     params = NUM_PARAMS
@@ -42,6 +51,9 @@ class TimeBasicCustomGenerator:
     def time_basic_custom_generator(self, num):
         self.g1.generate(num=num)
 
+    def time_basic_custom_generator_columnar(self, num):
+        self.g1.generate(num=num, columnar=True)
+
 
 class TimeComplexCustomGeneratorWithExplicitlyNamedFields:
 
@@ -53,6 +65,9 @@ class TimeComplexCustomGeneratorWithExplicitlyNamedFields:
     def time_complex_custom_generator_with_explicitly_named_fields(self, num):
         self.g2.generate(num=num)
 
+    def time_complex_custom_generator_with_explicitly_named_fields_inexact(self, num):
+        self.g2.generate(num=num, exact=False)
+
 
 class TimeComplexCustomGeneratorWithAnonymousFields:
     params = NUM_PARAMS
@@ -62,3 +77,22 @@ class TimeComplexCustomGeneratorWithAnonymousFields:
 
     def time_complex_custom_generator_with_anonymous_fields(self, num):
         self.g3.generate(num=num)
+
+
+class TimeWideCustomGenerator:
+    """
+    Measures how the cost of producing items scales with the number of fields.
+    """
+    params = [10, 100, 500]
+    param_names = ['num_fields']
+
+    def setup(self, num_fields):
+        self.g = make_wide_custom_generator(num_fields)
+        self.g.reset(seed=12345)
+
+    def time_wide_custom_generator_next(self, num_fields):
+        for _ in range(1_000):
+            next(self.g)
+
+    def time_wide_custom_generator(self, num_fields):
+        self.g.generate(num=1_000)
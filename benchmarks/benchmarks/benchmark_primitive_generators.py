@@ -24,6 +24,9 @@ class TimeInteger:
     def time_integer(self, num):
         self.g.generate(num=num)
 
+    def time_integer_inexact(self, num):
+        self.g.generate(num=num, exact=False)
+
 
 class TimeHashDigest:
 
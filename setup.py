@@ -30,7 +30,7 @@ setup(
         "Programming Language :: Python :: 3.6",
     ],
     packages=["tohu", "tohu/v4", "tohu/v6", "tohu/v6/custom_generator/", "tohu/v7"],
-    install_requires=["attrs", "bidict", "faker", "geojson", "pandas", "psycopg2-binary", "shapely", "sqlalchemy", "tqdm"],
+    install_requires=["attrs", "bidict", "faker", "geojson", "pandas", "psycopg2-binary", "shapely>=2.0", "sqlalchemy", "tqdm"],
     extras_require={"dev": ["ipython", "jupyter"], "test": ["pytest", "nbval"]},
     cmdclass=versioneer.get_cmdclass(),
 )
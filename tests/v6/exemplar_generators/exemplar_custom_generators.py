@@ -1,6 +1,6 @@
 from ..context import tohu
 from tohu.v6.primitive_generators import Constant, Integer, HashDigest, FakerGenerator
-from tohu.v6.derived_generators import Lookup, SelectMultiple
+from tohu.v6.derived_generators import Apply, Cumsum, Lookup, SelectMultiple
 from tohu.v6.custom_generator import CustomGenerator
 
 __all__ = ['EXEMPLAR_CUSTOM_GENERATORS', 'Quux1Generator', 'Quux2Generator', 'Quux3Generator', 'Quux4Generator']
@@ -73,10 +73,24 @@ class Quux5Generator(CustomGenerator):
     g = SelectMultiple(Lookup(key=Integer(1, 3), mapping=mapping), num=n_vals)
 
 
+class Quux6Generator(CustomGenerator):
+    """
+    Custom generator with a chain of dependent field generators
+    whose clones read their values from a shared buffer.
+    """
+    __shared_clones__ = True
+
+    aa = Integer(1, 3)
+    ll = Lookup(key=aa, mapping={1: 'a', 2: 'b', 3: 'c'})
+    bb = Apply(lambda x, y: x * y, ll, aa)
+    cs = Cumsum(aa)
+
+
 EXEMPLAR_CUSTOM_GENERATORS = [
     Quux1Generator(),
     Quux2Generator(method="name"),
     Quux3Generator(length=10),
     Quux4Generator(),
     Quux5Generator(),
+    Quux6Generator(),
 ]
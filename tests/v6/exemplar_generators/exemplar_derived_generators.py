@@ -42,6 +42,8 @@ EXEMPLAR_DERIVED_GENERATORS = [
         mapping=Constant({1: "a", 2: "b", 3: "c", 4: "d", 5: "e"}).set_tohu_name("mm"),
     ),
     SelectOne(values=["a", "b", "c", "d", "e"]),
+    SelectOne(values=["a", "b", "c", "d", "e"], p=[0.1, 0.3, 0.2, 0.15, 0.25]),
+    SelectOne(values=SelectMultiple(values=["a", "b", "c", "d", "e"], num=Integer(1, 5))),
     SelectMultiple(values=["a", "b", "c", "d", "e"], num=Integer(1, 5)),
     Tee(IntegerDerived(low=Integer(100, 200), high=Integer(300, 400)), num=Integer(1, 8)),
     TimestampDerived(
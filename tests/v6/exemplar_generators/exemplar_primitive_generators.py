@@ -23,10 +23,12 @@ EXEMPLAR_PRIMITIVE_GENERATORS = [
     HashDigest(length=8),
     Sequential(prefix='Foo_', digits=3),
     NumpyRandomGenerator(method="poisson", lam=30),
+    NumpyRandomGenerator(method="normal", loc=3.0, scale=5.0, block_size=7),
     FakerGenerator(method="name"),
     Timestamp(start="2018-01-01 11:22:33", end="2019-04-12 20:00:05"),
     Date(start="1999-04-01", end="2000-05-02"),
     GeoJSONGeolocation(geojson_sample_file, include_attributes=['name', 'pop_est'], max_tries=500),
+    GeoJSONGeolocation(geojson_sample_file, include_attributes=['name'], sampling='triangulation'),
 ]
 
 
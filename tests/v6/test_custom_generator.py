@@ -1,10 +1,13 @@
+import attr
 import datetime as dt
 import pandas as pd
 
 from .context import tohu
+from tohu.v6.base import SharedValueClone
 from tohu.v6.primitive_generators import Constant, Integer, HashDigest, FakerGenerator, Timestamp
-from tohu.v6.derived_generators import Apply, Lookup, SelectMultiple, SelectOne
+from tohu.v6.derived_generators import Apply, Cumsum, Lookup, SelectMultiple, SelectOne
 from tohu.v6.custom_generator import CustomGenerator
+from tohu.v6.item_list import ColumnarItemList
 from .exemplar_generators.exemplar_custom_generators import *
 
 
@@ -285,3 +288,310 @@ def test_custom_generator_with_its_own_init_method():
     assert items[1] == (192, '2553FCD0')
     assert items[2] == (192, 'CFF9005D')
     assert items[3] == (196, 'E9D2528C')
+
+
+def test_generate_columnar_produces_same_items_as_row_based_generation(quux_gen_4):
+    items_expected = quux_gen_4.generate(num=20, seed=12345)
+    items = quux_gen_4.generate(num=20, seed=12345, columnar=True)
+
+    assert isinstance(items, ColumnarItemList)
+    assert len(items) == 20
+    assert list(items) == list(items_expected)
+    assert items[3] == items_expected[3]
+    assert items[-1] == items_expected[-1]
+    assert items[5:8] == items_expected[5:8]
+
+
+def test_generate_columnar_stores_field_values_column_by_column(quux_gen_4):
+    items_expected = quux_gen_4.generate(num=20, seed=12345)
+    items = quux_gen_4.generate(num=20, seed=12345, columnar=True)
+
+    assert items.field_names == ['bb', 'dd', 'cc']
+    assert list(items.columns['dd']) == [x.dd for x in items_expected]
+    assert list(items.columns['cc']) == [x.cc for x in items_expected]
+
+
+def make_quux_generator_with_dependent_fields(shared_clones):
+    mapping = {x: 10 * x for x in range(1, 7)}
+
+    class QuuxGenerator(CustomGenerator):
+        __shared_clones__ = shared_clones
+
+        aa = Integer(1, 6)
+        ll = Lookup(key=aa, mapping=mapping)
+        bb = Apply(lambda x, y: x + y, ll, aa)
+        cc = Cumsum(aa)
+        dd = SelectMultiple(['a', 'b', 'c', 'd'], num=Integer(0, 3))
+        ee = Apply(len, dd)
+
+    return QuuxGenerator()
+
+
+def test_shared_clones_read_values_of_original_generator_from_shared_buffer():
+    g = make_quux_generator_with_dependent_fields(shared_clones=True)
+
+    assert isinstance(g.ll.arg_gens[0], SharedValueClone)
+    assert isinstance(g.bb.arg_gens[0], SharedValueClone)
+    assert g.ll.arg_gens[0].buffer is g.aa._shared_value_buffer
+    assert g.field_gens['aa'].buffer is g.aa._shared_value_buffer
+
+    # Clones of constant generators are still regular copies
+    assert isinstance(g.ll.arg_gens[1], Constant)
+
+    g_regular = make_quux_generator_with_dependent_fields(shared_clones=False)
+    assert not isinstance(g_regular.ll.arg_gens[0], SharedValueClone)
+    assert g_regular.aa._shared_value_buffer is None
+
+
+def test_shared_clones_produce_same_items_as_regular_clones():
+    g_shared = make_quux_generator_with_dependent_fields(shared_clones=True)
+    g_regular = make_quux_generator_with_dependent_fields(shared_clones=False)
+
+    def as_tuples(items):
+        return [attr.astuple(x) for x in items]
+
+    items_expected = as_tuples(g_regular.generate(num=200, seed=12345))
+    assert as_tuples(g_shared.generate(num=200, seed=12345)) == items_expected
+
+    g_shared.reset(12345)
+    assert as_tuples([next(g_shared) for _ in range(200)]) == items_expected
+
+    g_shared.reset(12345)
+    items = as_tuples(g_shared.generate(num=50)) + as_tuples([next(g_shared) for _ in range(150)])
+    assert items == items_expected
+
+    # Resetting with the same seed reproduces the same items in non-exact mode, too
+    items_inexact = as_tuples(g_shared.generate(num=200, seed=99, exact=False))
+    assert as_tuples(g_shared.generate(num=200, seed=99, exact=False)) == items_inexact
+    assert all(x[1] == 10 * x[0] and x[2] == x[1] + x[0] for x in items_inexact)
+
+
+def test_shared_value_buffer_discards_values_read_by_all_clones():
+    g = make_quux_generator_with_dependent_fields(shared_clones=True)
+    g.generate(num=10_000, seed=12345)
+    g.generate(num=10_000)
+    assert g.aa._shared_value_buffer.num_buffered <= 10_001
+
+    g.reset(12345)
+    for _ in range(10_000):
+        next(g)
+    assert g.aa._shared_value_buffer.num_buffered < 3000
+
+
+def test_shared_value_buffer_stays_bounded_if_clones_are_not_read():
+
+    class QuuxGenerator(CustomGenerator):
+        __shared_clones__ = True
+        __fields__ = ['bb']
+
+        aa = Integer(1, 6)
+        bb = Apply(lambda x: 2 * x, aa)
+        cc = Apply(lambda x: x + 1, aa)
+
+    g = QuuxGenerator()
+    items = g.generate(num=50_000, seed=12345)
+    assert g.aa._shared_value_buffer.num_buffered <= 50_001
+
+    g.generate(num=50_000)
+    assert g.aa._shared_value_buffer.num_buffered <= 50_001
+
+    g.reset(12345)
+    for _ in range(50_000):
+        next(g)
+    assert g.aa._shared_value_buffer.num_buffered < 3000
+
+    assert [x.bb for x in QuuxGenerator().generate(num=100, seed=12345)] == [x.bb for x in items[:100]]
+
+
+def make_quux_generator_with_clones_of_different_configuration(shared_clones):
+
+    class QuuxGenerator(CustomGenerator):
+        __shared_clones__ = shared_clones
+
+        aa = Integer(1, 6)
+        ts = Timestamp(start="2018-01-01", end="2018-12-31")
+        ts_month = ts.strftime("%Y-%m")
+        ts_day = Apply(lambda x: x.day, ts)
+        hh = HashDigest(length=8)
+        hh_lower = Apply(str.lower, hh)
+        ll = Lookup(key=aa, mapping={x: 10 * x for x in range(1, 7)})
+        cc = Cumsum(ll)
+
+    return QuuxGenerator()
+
+
+def test_shared_clones_preserve_configuration_of_clones():
+    g_shared = make_quux_generator_with_clones_of_different_configuration(shared_clones=True)
+    g_regular = make_quux_generator_with_clones_of_different_configuration(shared_clones=False)
+
+    # Clones which are configured differently from their parent are not replaced with shared-value clones
+    assert not isinstance(g_shared.ts_month, SharedValueClone)
+    assert isinstance(g_shared.ts_day.arg_gens[0], SharedValueClone)
+
+    def as_tuples(items):
+        return [attr.astuple(x) for x in items]
+
+    items_expected = as_tuples(g_regular.generate(num=100, seed=12345))
+    assert all(isinstance(x[2], str) for x in items_expected)
+    assert as_tuples(g_shared.generate(num=100, seed=12345)) == items_expected
+
+    g_shared.reset(12345)
+    assert as_tuples([next(g_shared) for _ in range(100)]) == items_expected
+
+    g_shared.reset(12345)
+    g_shared.generate(num=30)
+    h = g_shared.spawn()
+    assert as_tuples(h.generate(num=70)) == items_expected[30:]
+    assert as_tuples(h.generate(num=100, seed=12345)) == items_expected
+
+
+def test_shared_clones_are_only_used_by_custom_generators_which_request_them():
+    g = make_quux_generator_with_dependent_fields(shared_clones=True)
+    assert g.aa.use_shared_clones
+
+    aa = Integer(1, 6)
+    assert not isinstance(aa.clone(), SharedValueClone)
+    assert not isinstance(make_quux_generator_with_dependent_fields(shared_clones=False).ll.arg_gens[0], SharedValueClone)
+
+
+def test_spawned_shared_value_clones_are_independent():
+    aa = Integer(1, 1000)
+    aa.use_shared_clones = True
+    c = aa.clone()
+    assert isinstance(c, SharedValueClone)
+
+    c1 = c.spawn()
+    c2 = c.spawn()
+    c1.reset(seed=11111)
+    c2.reset(seed=22222)
+    assert c1.buffer is not c.buffer
+    assert list(c1.generate(num=20)) == list(Integer(1, 1000).generate(num=20, seed=11111))
+    assert list(c2.generate(num=20)) == list(Integer(1, 1000).generate(num=20, seed=22222))
+
+
+def test_custom_generator_with_many_fields_produces_items_with_fields_in_the_correct_order():
+    num_fields = 300
+    field_gens = {f'field_{i:03d}': Constant(i) for i in range(num_fields)}
+    field_gens['aa'] = Integer(100, 200)
+    WideGenerator = type('WideGenerator', (CustomGenerator,), field_gens)
+
+    g = WideGenerator()
+    item = next(g.reset(seed=12345))
+    assert attr.astuple(item)[:num_fields] == tuple(range(num_fields))
+    assert item.field_123 == 123
+    assert 100 <= item.aa <= 200
+
+    items = g.generate(num=5, seed=12345)
+    g.reset(seed=12345)
+    assert list(items) == [next(g) for _ in range(5)]
+
+
+def test_custom_generators_with_same_item_name_and_fields_share_the_same_tohu_items_class():
+
+    def make_quux_generator_class():
+        class QuuxGenerator(CustomGenerator):
+            aa = Integer(100, 200)
+            bb = HashDigest(length=8)
+
+        return QuuxGenerator
+
+    g1 = make_quux_generator_class()()
+    g2 = make_quux_generator_class()()
+    assert g1.tohu_items_cls is g2.tohu_items_cls
+    assert g1.generate(num=5, seed=12345) == g2.generate(num=5, seed=12345)
+
+
+def test_tohu_items_are_compact_and_support_dict_and_tuple_access(quux_gen_1):
+    item = quux_gen_1.tohu_items_cls(aa=42, bb='C851F707', cc='Jane Dae')
+
+    assert not hasattr(item, '__dict__')
+    assert item == (42, 'C851F707', 'Jane Dae')
+    assert item == {'aa': 42, 'bb': 'C851F707', 'cc': 'Jane Dae'}
+    assert item.as_dict() == {'aa': 42, 'bb': 'C851F707', 'cc': 'Jane Dae'}
+    assert list(item.keys()) == ['aa', 'bb', 'cc']
+    assert item['bb'] == 'C851F707'
+    assert item.to_series().to_dict() == {'aa': 42, 'bb': 'C851F707', 'cc': 'Jane Dae'}
+    assert repr(item) == "Quux1(aa=42, bb='C851F707', cc='Jane Dae')"
+
+
+def test_field_generators_are_initialised_once_per_instance(monkeypatch):
+    num_calls = 0
+    orig_set_field_names = CustomGenerator._set_field_names
+
+    def counting_set_field_names(self):
+        nonlocal num_calls
+        num_calls += 1
+        orig_set_field_names(self)
+
+    monkeypatch.setattr(CustomGenerator, "_set_field_names", counting_set_field_names)
+
+    class QuuxGenerator(CustomGenerator):
+        aa = Integer(100, 200)
+
+    class QuuxWithInitGenerator(CustomGenerator):
+        aa = Integer(100, 200)
+
+        def __init__(self, length):
+            super().__init__()
+            self.bb = HashDigest(length=length)
+
+    g = QuuxGenerator()
+    assert num_calls == 1
+    assert g.ns_gen_templates["aa"] is QuuxGenerator.__dict__["aa"]
+
+    h = QuuxWithInitGenerator(length=8)
+    assert num_calls == 2
+    assert h.field_names == ["aa", "bb"]
+    assert len(h.ns_gen_templates.all_generators) == 2
+
+
+def test_instances_of_custom_generator_share_field_generator_templates():
+    g1 = Quux1Generator()
+    g2 = Quux1Generator()
+    assert g1.ns_gen_templates is g2.ns_gen_templates
+    assert g1.field_names is g2.field_names
+    assert g1.aa is not g2.aa
+    assert g1.generate(num=5, seed=12345) == g2.generate(num=5, seed=12345)
+
+    # Generators defined in __init__ are specific to each instance, so the templates can't be shared.
+    h1 = Quux2Generator(method='name')
+    h2 = Quux2Generator(method='name')
+    assert h1.ns_gen_templates is not h2.ns_gen_templates
+    assert h1.ff is not h2.ff
+
+
+def test_field_generator_templates_are_updated_when_class_generators_change():
+
+    class QuuxGenerator(CustomGenerator):
+        aa = Integer(100, 200)
+
+    g1 = QuuxGenerator()
+    QuuxGenerator.aa = Integer(300, 400)
+    g2 = QuuxGenerator()
+
+    assert g1.ns_gen_templates is not g2.ns_gen_templates
+    assert all(100 <= x.aa <= 200 for x in g1.generate(num=10, seed=12345))
+    assert all(300 <= x.aa <= 400 for x in g2.generate(num=10, seed=12345))
+
+
+def test_spawn_does_not_call_init_again():
+    init_calls = []
+
+    class QuuxGenerator(CustomGenerator):
+        aa = Integer(100, 200)
+
+        def __init__(self, length):
+            init_calls.append(length)
+            self.length = length
+            self.bb = HashDigest(length=length)
+
+    g = QuuxGenerator(length=6)
+    g.reset(seed=12345)
+    g.generate(num=3)
+
+    h = g.spawn()
+    assert init_calls == [6]
+    assert h.length == 6
+    assert h.field_names == ["aa", "bb"]
+    assert h.bb is not g.bb
+    assert h.generate(num=10) == g.generate(num=10)
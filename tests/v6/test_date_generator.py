@@ -1,4 +1,5 @@
 import datetime as dt
+import pytest
 
 from .context import tohu
 from tohu.v6.primitive_generators import Date
@@ -27,3 +28,22 @@ def test_start_and_end():
     g = Date(start="1999-11-28", end="1999-12-01")
     assert g.start == dt.date(1999, 11, 28)
     assert g.end == dt.date(1999, 12, 1)
+
+
+@pytest.mark.parametrize("fmt, uppercase", [(None, None), ("%Y-%m-%d", False), ("%d %b %Y", True)])
+def test_next_batch_produces_same_dates_as_next(fmt, uppercase):
+    g = Date(start="1999-04-01", end="2000-05-02", fmt=fmt, uppercase=uppercase)
+
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(100)]
+
+    g.reset(seed=12345)
+    items = g.next_batch(100)
+
+    assert items == items_expected
+
+
+def test_inexact_batch_generation_of_dates():
+    g = Date(start="2018-02-27", end="2018-03-02")
+    items = g.reset(seed=12345).next_batch(1000, exact=False)
+    assert set(items) == {dt.date(2018, 2, 27), dt.date(2018, 2, 28), dt.date(2018, 3, 1), dt.date(2018, 3, 2)}
@@ -0,0 +1,48 @@
+import os
+import pytest
+
+from .exemplar_generators.exemplar_primitive_generators import geojson_sample_file
+
+from .context import tohu
+from tohu.v6.geojson_cache import get_cache_filename
+from tohu.v6.primitive_generators import GeoJSONGeolocation
+
+
+@pytest.mark.parametrize("sampling", ["rejection", "triangulation"])
+def test_geojson_geolocation_creates_and_reuses_cache_file(sampling, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path)
+    cache_filename = get_cache_filename(cache_dir, geojson_sample_file, include_attributes=['name'], sampling=sampling)
+    assert not os.path.exists(cache_filename)
+
+    g1 = GeoJSONGeolocation(geojson_sample_file, include_attributes=['name'], sampling=sampling, max_tries=10000)
+    g2 = GeoJSONGeolocation(geojson_sample_file, include_attributes=['name'], sampling=sampling, max_tries=10000, cache_dir=cache_dir)
+    assert os.path.exists(cache_filename)
+
+    # Loading the file again must use the cache rather than parsing the GeoJSON data.
+    def raise_error(self):
+        raise AssertionError("GeoJSON data should not be parsed")
+
+    monkeypatch.setattr(GeoJSONGeolocation, "_make_shape_generators", raise_error)
+    g3 = GeoJSONGeolocation(geojson_sample_file, include_attributes=['name'], sampling=sampling, max_tries=10000, cache_dir=cache_dir)
+
+    items1 = [(x.lon, x.lat, x.name) for x in g1.generate(200, seed=12345)]
+    items2 = [(x.lon, x.lat, x.name) for x in g2.generate(200, seed=12345)]
+    items3 = [(x.lon, x.lat, x.name) for x in g3.generate(200, seed=12345)]
+    assert items1 == items2 == items3
+
+
+def test_cache_filename_depends_on_options():
+    filenames = {
+        get_cache_filename("foo", geojson_sample_file, include_attributes=[], sampling="rejection"),
+        get_cache_filename("foo", geojson_sample_file, include_attributes=['name'], sampling="rejection"),
+        get_cache_filename("foo", geojson_sample_file, include_attributes=['name'], sampling="triangulation"),
+    }
+    assert len(filenames) == 3
+
+
+def test_geojson_data_is_loaded_on_demand_when_using_cache(tmp_path):
+    GeoJSONGeolocation(geojson_sample_file, cache_dir=str(tmp_path))
+    g = GeoJSONGeolocation(geojson_sample_file, cache_dir=str(tmp_path))
+
+    assert g._geojson_data is None
+    assert len(g.geojson_data['features']) == len(g.shape_gens)
@@ -0,0 +1,112 @@
+import pandas as pd
+import pytest
+
+from .context import tohu
+from tohu.v6.primitive_generators import Integer, HashDigest, Sequential
+from tohu.v6.derived_generators import SelectMultiple, SelectOne
+from tohu.v6.custom_generator import CustomGenerator
+from tohu.v6.item_list import ColumnarItemList
+from tohu.v6.utils import make_dummy_tuples
+
+
+class QuuxGenerator(CustomGenerator):
+    aa = Integer(100, 200)
+    bb = HashDigest(length=8)
+    cc = Sequential(prefix="Foo_", digits=3)
+    dd = SelectOne(make_dummy_tuples("abcdefgh"))
+    ee = SelectMultiple(make_dummy_tuples("ijklmnop"), num=Integer(1, 3))
+
+
+@pytest.fixture
+def item_lists():
+    g = QuuxGenerator()
+    items = g.generate(num=50, seed=12345)
+    items_columnar = g.generate(num=50, seed=12345, columnar=True)
+    return items, items_columnar
+
+
+def test_columnar_item_list_contains_the_same_items(item_lists):
+    items, items_columnar = item_lists
+    assert isinstance(items_columnar, ColumnarItemList)
+    assert items_columnar == list(items)
+
+
+@pytest.mark.parametrize("fields", [None, ["cc", "aa"], {"COL1": "bb", "COL2": "dd.x"}])
+def test_to_df(item_lists, fields):
+    items, items_columnar = item_lists
+    df_expected = items.to_df(fields=fields)
+    df = items_columnar.to_df(fields=fields)
+    pd.testing.assert_frame_equal(df, df_expected)
+
+
+def test_to_df_converts_field_values_like_item_list(item_lists):
+    items, items_columnar = item_lists
+    df_expected = items.to_df()
+    df = items_columnar.to_df()
+    assert df.values.tolist() == df_expected.values.tolist()
+
+
+class InnerGenerator(CustomGenerator):
+    x = Integer(1, 9)
+
+
+class OuterGenerator(CustomGenerator):
+    aa = Integer(100, 200)
+    inner = InnerGenerator()
+
+
+def test_to_df_flattens_nested_custom_generator_items():
+    g = OuterGenerator()
+    items = g.generate(num=20, seed=12345)
+    items_columnar = g.generate(num=20, seed=12345, columnar=True)
+    df_expected = items.to_df()
+    df = items_columnar.to_df()
+    assert isinstance(df["inner"][0], tuple)
+    assert df.values.tolist() == df_expected.values.tolist()
+
+
+def test_to_df_with_exploded_fields(item_lists):
+    items, items_columnar = item_lists
+    fields = {"aa": "aa", "ee_x": "ee.x"}
+    df_expected = items.to_df(fields=fields, fields_to_explode=["ee_x"])
+    df = items_columnar.to_df(fields=fields, fields_to_explode=["ee_x"])
+    pd.testing.assert_frame_equal(df, df_expected)
+
+
+def test_to_df_raises_error_for_invalid_attribute_name(item_lists):
+    _, items_columnar = item_lists
+    with pytest.raises(AttributeError):
+        items_columnar.to_df(fields={"COL1": "dd.nonexisting_attribute"})
+
+
+@pytest.mark.parametrize("fields", [["aa", "bb", "cc"], {"COL1": "cc", "COL2": "dd.y"}])
+def test_to_csv(item_lists, fields):
+    items, items_columnar = item_lists
+    csv_expected = items.to_csv(fields=fields, sep=";")
+    csv = items_columnar.to_csv(fields=fields, sep=";")
+    assert csv == csv_expected
+
+
+def test_to_csv_writes_file_in_chunks(item_lists, tmpdir, monkeypatch):
+    items, items_columnar = item_lists
+    monkeypatch.setattr("tohu.v6.item_list.CSV_EXPORT_CHUNK_SIZE", 7)
+
+    filename_expected = tmpdir.join("items_expected.csv").strpath
+    filename = tmpdir.join("items.csv").strpath
+    items.to_csv(filename_expected, fields=["aa", "bb"])
+    items_columnar.to_csv(filename, fields=["aa", "bb"])
+
+    assert open(filename).read() == open(filename_expected).read()
+
+
+def test_subsample(item_lists):
+    items, items_columnar = item_lists
+
+    subsample_expected = items.subsample(num=10, seed=99999)
+    subsample = items_columnar.subsample(num=10, seed=99999)
+    assert isinstance(subsample, ColumnarItemList)
+    assert list(subsample) == list(subsample_expected)
+
+    subsample_expected = items.subsample(p=0.3, seed=99999)
+    subsample = items_columnar.subsample(p=0.3, seed=99999)
+    assert list(subsample) == list(subsample_expected)
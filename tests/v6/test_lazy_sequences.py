@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from .context import tohu
+from tohu.v6.primitive_generators import Constant, Incremental, Integer, Sequential
+from tohu.v6.custom_generator import CustomGenerator
+from tohu.v6.lazy_sequences import PrefixedCounter, RepeatedValue, to_numpy_column
+
+
+def test_repeated_value():
+    seq = RepeatedValue("foo", 4)
+    assert len(seq) == 4
+    assert list(seq) == ["foo", "foo", "foo", "foo"]
+    assert seq[2] == "foo"
+    assert seq[-1] == "foo"
+    assert list(seq[1:3]) == ["foo", "foo"]
+    assert list(to_numpy_column(seq)) == ["foo", "foo", "foo", "foo"]
+
+    with pytest.raises(IndexError):
+        seq[4]
+
+
+def test_repeated_value_with_sequence_value_is_converted_to_object_array():
+    seq = RepeatedValue([1, 2], 3)
+    arr = to_numpy_column(seq)
+    assert arr.shape == (3,)
+    assert list(arr) == [[1, 2], [1, 2], [1, 2]]
+
+
+def test_prefixed_counter():
+    seq = PrefixedCounter("Foo_", 3, start=998, num=4)
+    assert len(seq) == 4
+    assert list(seq) == ["Foo_998", "Foo_999", "Foo_1000", "Foo_1001"]
+    assert seq[1] == "Foo_999"
+    assert seq[-1] == "Foo_1001"
+    assert list(seq[1:3]) == ["Foo_999", "Foo_1000"]
+    assert list(seq[::2]) == ["Foo_998", "Foo_1000"]
+    assert list(to_numpy_column(seq)) == ["Foo_998", "Foo_999", "Foo_1000", "Foo_1001"]
+
+
+def test_range_is_converted_to_numpy_array():
+    arr = to_numpy_column(range(200, 240, 4))
+    assert isinstance(arr, np.ndarray)
+    assert list(arr) == list(range(200, 240, 4))
+
+
+@pytest.mark.parametrize("g, expected_type", [
+    (Constant("quux"), RepeatedValue),
+    (Incremental(start=200, step=4), range),
+    (Incremental(start=200, step=0), RepeatedValue),
+    (Sequential(prefix="Foo_", digits=3), PrefixedCounter),
+])
+def test_next_batch_returns_lazy_sequences(g, expected_type):
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(30)]
+
+    g.reset(seed=12345)
+    batch1 = g.next_batch(10)
+    batch2 = g.next_batch(20)
+
+    assert isinstance(batch1, expected_type)
+    assert list(batch1) + list(batch2) == items_expected
+
+
+def test_incremental_with_float_step_accumulates_values_like_next():
+    g = Incremental(start=0.1, step=0.1)
+    items_expected = [next(g) for _ in range(30)]
+    g.reset()
+    assert list(g.next_batch(30)) == items_expected
+
+
+def test_columnar_export_of_lazy_columns():
+    class QuuxGenerator(CustomGenerator):
+        aa = Constant("foobar")
+        bb = Incremental(start=100, step=3)
+        cc = Sequential(prefix="Quux_", digits=4)
+        dd = Integer(1, 10)
+
+    g = QuuxGenerator()
+    items = g.generate(num=50, seed=12345)
+    items_columnar = g.generate(num=50, seed=12345, columnar=True)
+
+    assert isinstance(items_columnar.columns["cc"], PrefixedCounter)
+    assert list(items_columnar) == list(items)
+    pd.testing.assert_frame_equal(items_columnar.to_df(), items.to_df())
+    assert items_columnar.to_csv(fields=["aa", "bb", "cc"]) == items.to_csv(fields=["aa", "bb", "cc"])
+    assert list(items_columnar.subsample(num=10, seed=99999)) == list(items.subsample(num=10, seed=99999))
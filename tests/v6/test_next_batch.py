@@ -0,0 +1,582 @@
+import numpy as np
+import pytest
+import shapely
+
+from collections import Counter, defaultdict
+from shapely.geometry import Polygon
+from .exemplar_generators import EXEMPLAR_GENERATORS, EXEMPLAR_PRIMITIVE_GENERATORS, EXEMPLAR_DERIVED_GENERATORS, EXEMPLAR_CUSTOM_GENERATORS
+from .exemplar_generators.exemplar_primitive_generators import geojson_sample_file
+
+from .context import tohu
+from tohu.v6.base import TohuBaseGenerator
+from tohu.v6.primitive_generators import Boolean, CharString, Date, DigitString, Float, GeoJSONGeolocation, HashDigest, \
+    Integer, NumpyRandomGenerator, ShapelyGeolocation, Timestamp
+from random import Random
+from tohu.v6.custom_generator import CustomGenerator
+from tohu.v6.derived_generators import Apply, Cumsum, Lookup, SelectMultiple, SelectOne
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_GENERATORS)
+def test_exemplar_generators_support_batch_generation(g):
+    assert g.supports_batch
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_PRIMITIVE_GENERATORS)
+def test_next_batch_produces_same_items_as_next_for_primitive_generators(g):
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(30)]
+
+    g.reset(seed=12345)
+    items = list(g.next_batch(10)) + list(g.next_batch(20))
+
+    assert items == items_expected
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_DERIVED_GENERATORS)
+def test_next_batch_produces_same_items_as_next_for_derived_generators(g):
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+    items_expected = [next(g) for _ in range(30)]
+
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+    items = list(g.next_batch(10)) + list(g.next_batch(20))
+
+    assert items == items_expected
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_PRIMITIVE_GENERATORS + EXEMPLAR_CUSTOM_GENERATORS)
+def test_generate_produces_same_items_with_and_without_progressbar(g):
+    items_1 = g.generate(num=30, seed=99999)
+    items_2 = g.generate(num=30, seed=99999, progressbar=True)
+    assert list(items_1) == list(items_2)
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_CUSTOM_GENERATORS)
+def test_generate_produces_same_items_as_next_for_custom_generators(g):
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(30)]
+
+    items = g.generate(num=30, seed=12345)
+
+    assert list(items) == items_expected
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_PRIMITIVE_GENERATORS)
+def test_inexact_batch_generation_is_reproducible(g):
+    g.reset(seed=12345)
+    items1 = list(g.next_batch(20, exact=False))
+
+    g.reset(seed=12345)
+    items2 = list(g.next_batch(20, exact=False))
+
+    assert items1 == items2
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_PRIMITIVE_GENERATORS)
+def test_spawned_generators_produce_same_items_in_inexact_batch_generation(g):
+    g.reset(seed=12345)
+    g.next_batch(10, exact=False)
+
+    h = g.spawn()
+    items_g = list(g.next_batch(20, exact=False))
+    items_h = list(h.next_batch(20, exact=False))
+
+    assert items_g == items_h
+
+
+@pytest.mark.parametrize("g, expected_dtype", [
+    (Integer(100, 200), np.int64),
+    (Float(12.3, 45.6), np.float64),
+    (Boolean(p=0.3), np.bool_),
+])
+def test_inexact_batch_generation_returns_numpy_arrays(g, expected_dtype):
+    items = g.next_batch(1000, exact=False)
+    assert isinstance(items, np.ndarray)
+    assert items.dtype == expected_dtype
+
+
+def test_inexact_batch_generation_respects_bounds():
+    items = Integer(100, 105).reset(seed=12345).next_batch(1000, exact=False)
+    assert set(items) == {100, 101, 102, 103, 104, 105}
+
+    items = Float(12.3, 45.6).reset(seed=12345).next_batch(1000, exact=False)
+    assert all((12.3 <= items) & (items <= 45.6))
+
+    items = Boolean(p=0.3).reset(seed=12345).next_batch(10000, exact=False)
+    assert 0.28 < items.mean() < 0.32
+
+
+@pytest.mark.parametrize("g", [
+    CharString(length=12, charset="<alphanumeric_uppercase>"),
+    CharString(length=7, charset="äöüß"),
+    DigitString(length=4),
+    DigitString(length=25),
+])
+def test_inexact_batch_generation_of_character_strings(g):
+    items = g.reset(seed=12345).next_batch(2000, exact=False)
+    assert all(isinstance(x, str) and len(x) == g.length for x in items)
+    assert set("".join(items)) == set(g.charset)
+
+
+def test_inexact_batch_generation_of_digit_strings_includes_zero_padded_values():
+    items = DigitString(length=2).reset(seed=12345).next_batch(2000, exact=False)
+    assert set(items) == {f"{i:02d}" for i in range(100)}
+
+
+@pytest.mark.parametrize("g", [
+    HashDigest(length=8),
+    HashDigest(length=6, uppercase=False),
+    HashDigest(length=5, as_bytes=True),
+    HashDigest(length=12, as_bytes=True),
+])
+def test_next_batch_produces_same_hash_digests_as_next(g):
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(30)]
+
+    g.reset(seed=12345)
+    items = g.next_batch(30)
+
+    assert items == items_expected
+
+
+@pytest.mark.parametrize("g", [HashDigest(length=6), HashDigest(length=8, uppercase=False), HashDigest(length=5, as_bytes=True)])
+def test_inexact_batch_generation_of_hash_digests(g):
+    items = g.reset(seed=12345).next_batch(100, exact=False)
+    expected_type = bytes if g.as_bytes else str
+
+    assert all(isinstance(x, expected_type) and len(x) == g.length for x in items)
+    if not g.as_bytes:
+        assert all(x.upper() == x if g.uppercase else x.lower() == x for x in items)
+        assert all(int(x, base=16) >= 0 for x in items)
+
+
+@pytest.mark.parametrize("g", [
+    Integer(100, 200),
+    Float(12.3, 45.6),
+    Boolean(p=0.3),
+    CharString(length=6),
+    DigitString(length=4),
+    HashDigest(length=6),
+    Timestamp(start="2018-01-01", end="2018-12-31"),
+    Timestamp(start="2018-01-01", end="2018-12-31").strftime("%Y-%m-%d %H:%M"),
+    Date("2018-01-01", "2018-12-31"),
+    SelectOne(["a", "b", "c", "d"], p=[0.1, 0.2, 0.3, 0.4]),
+])
+def test_next_produces_same_items_as_inexact_batches_in_inexact_mode(g):
+    g._set_exact_mode(False)
+
+    g.reset(seed=12345)
+    items_expected = list(g.next_batch(1500, exact=False))
+
+    g.reset(seed=12345)
+    items = [next(g) for _ in range(5)] + list(g.next_batch(1490, exact=False)) + [next(g) for _ in range(5)]
+
+    assert items == items_expected
+
+
+class CumsumGenerator(CustomGenerator):
+    aa = Integer(1, 5)
+    bb = Float(0.0, 1.0)
+    cs_aa = Cumsum(aa)
+    cs_bb = Cumsum(bb)
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_dependent_fields_are_consistent_in_inexact_batch_generation(columnar):
+    g = CumsumGenerator()
+    items = g.generate(num=500, seed=12345, exact=False, columnar=columnar)
+    df = items.to_df()
+
+    assert df["cs_aa"].tolist() == np.cumsum(df["aa"]).tolist()
+    assert np.allclose(df["cs_bb"], np.cumsum(df["bb"]))
+
+
+class ScalarOnlyGenerator(TohuBaseGenerator):
+    """
+    Dummy generator which only implements the scalar protocol.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.value = 0
+
+    def __next__(self):
+        self.value += 1
+        return self.value
+
+    def reset(self, seed):
+        super().reset(seed)
+        self.value = 0
+        return self
+
+    def spawn(self, spawn_mapping=None):
+        new_obj = ScalarOnlyGenerator()
+        new_obj._set_random_state_from(self)
+        return new_obj
+
+    def _set_random_state_from(self, other):
+        super()._set_random_state_from(other)
+        self.value = other.value
+
+
+class ApplyWithCustomNext(Apply):
+    """
+    Dummy subclass of Apply which only customises the scalar protocol.
+    """
+
+    def __next__(self):
+        return 2 * super().__next__()
+
+
+def test_apply_subclass_which_only_overrides_next_does_not_support_batch_generation():
+    g = ApplyWithCustomNext(lambda x: x + 1, Integer(1, 5))
+    assert not g.supports_batch
+
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=99999)
+    items_expected = [next(g) for _ in range(20)]
+
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=99999)
+    assert list(g.generate(20)) == items_expected
+
+
+@pytest.mark.parametrize("method, numpy_args", [
+    ("normal", dict(loc=3.0, scale=5.0)),
+    ("poisson", dict(lam=30)),
+    ("multivariate_normal", dict(mean=[0, 1], cov=[[1, 0], [0, 2]])),
+    ("choice", dict(a=[10, 20, 30])),
+    ("choice", dict(a=["a", "b", "c"])),
+    ("randint", dict(low=0, high=10, dtype=np.int32)),
+])
+def test_buffered_numpy_random_generator_produces_same_items_as_unbuffered_one(method, numpy_args):
+    g = NumpyRandomGenerator(method, **numpy_args)
+    h = NumpyRandomGenerator(method, block_size=16, **numpy_args)
+
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(100)]
+    h.reset(seed=12345)
+    items = [next(h) for _ in range(37)] + list(h.next_batch(20)) + [next(h) for _ in range(43)]
+    items_generated = g.generate(100, seed=12345)
+
+    for result in [items, items_generated]:
+        assert len(result) == 100
+        assert all(type(x) == type(y) for x, y in zip(result, items_expected))
+        assert all(np.array_equal(x, y) for x, y in zip(result, items_expected))
+
+
+@pytest.mark.parametrize("method, numpy_args", [
+    ("rand", dict()),
+    ("bytes", dict(length=4)),
+    ("normal", dict(size=3)),
+    ("choice", dict(a=5, replace=False, size=2)),
+    ("choice", dict(a=5, replace=False)),
+])
+def test_numpy_random_generator_falls_back_to_scalar_generation_for_methods_without_size_argument(method, numpy_args):
+    g = NumpyRandomGenerator(method, **numpy_args)
+    assert not g.supports_batch
+
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(20)]
+    items = g.generate(20, seed=12345)
+    assert all(np.array_equal(x, y) for x, y in zip(items, items_expected))
+
+    g.reset(seed=12345)
+    items = g.next_batch(20)
+    assert all(np.array_equal(x, y) for x, y in zip(items, items_expected))
+
+    with pytest.raises(ValueError):
+        NumpyRandomGenerator(method, block_size=16, **numpy_args)
+
+
+def test_spawned_buffered_numpy_random_generator_continues_from_same_position_in_block():
+    g = NumpyRandomGenerator("normal", block_size=16).reset(seed=12345)
+    g.generate(10)
+    h = g.spawn()
+
+    assert h.generate(30) == g.generate(30)
+
+
+def make_thin_triangle_geolocation(max_tries=1000):
+    # Only about 1% of the bounding box is inside the shape, so that
+    # many candidate points are rejected (also across blocks).
+    return ShapelyGeolocation(Polygon([(0, 0), (10, 0), (10, 0.2)]), max_tries=max_tries)
+
+
+def test_next_batch_produces_same_locations_as_next_for_shapely_geolocation():
+    g = make_thin_triangle_geolocation()
+
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(200)]
+
+    g.reset(seed=12345)
+    items = g.next_batch(50) + [next(g) for _ in range(7)] + g.next_batch(143)
+
+    assert [(x.lon, x.lat) for x in items] == [(x.lon, x.lat) for x in items_expected]
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_next_batch_lonlat_returns_points_inside_shape(exact):
+    g = make_thin_triangle_geolocation().reset(seed=12345)
+    lons, lats = g.next_batch_lonlat(500, exact=exact)
+
+    assert lons.shape == lats.shape == (500,)
+    assert shapely.contains_xy(g.shape, lons, lats).all()
+
+
+def test_spawned_shapely_geolocation_continues_with_same_candidates():
+    g = make_thin_triangle_geolocation().reset(seed=12345)
+    g.next_batch_lonlat(13)
+    h = g.spawn()
+
+    lons_1, lats_1 = g.next_batch_lonlat(100)
+    lons_2, lats_2 = h.next_batch_lonlat(100)
+    assert np.array_equal(lons_1, lons_2)
+    assert np.array_equal(lats_1, lats_2)
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_shapely_geolocation_raises_error_if_max_tries_is_exceeded(exact):
+    g = make_thin_triangle_geolocation(max_tries=2).reset(seed=12345)
+    with pytest.raises(RuntimeError, match="Could not generate point in shape after 2 attempts"):
+        g.next_batch_lonlat(100, exact=exact)
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_triangulation_sampling_returns_points_inside_shape_without_rejections(exact):
+    g = ShapelyGeolocation(Polygon([(0, 0), (10, 0), (10, 0.2)]), max_tries=1, sampling="triangulation").reset(seed=12345)
+    lons, lats = g.next_batch_lonlat(500, exact=exact)
+
+    assert lons.shape == lats.shape == (500,)
+    assert shapely.covers(g.shape, shapely.points(lons, lats)).all()
+
+
+def test_triangulation_sampling_produces_same_locations_in_next_and_next_batch():
+    shp = Polygon([(0, 0), (4, 0), (4, 4), (2, 1), (0, 4)], holes=[[(0.5, 0.5), (1, 0.5), (1, 1)]])
+    g = ShapelyGeolocation(shp, sampling="triangulation")
+
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(100)]
+
+    g.reset(seed=12345)
+    items = g.next_batch(30) + [next(g) for _ in range(5)] + g.next_batch(65)
+
+    assert [(x.lon, x.lat) for x in items] == [(x.lon, x.lat) for x in items_expected]
+
+
+def test_triangulation_sampling_requires_recent_shapely_version(monkeypatch):
+    monkeypatch.delattr(shapely, "constrained_delaunay_triangles")
+
+    # Rejection sampling doesn't need the triangulation
+    ShapelyGeolocation(Polygon([(0, 0), (1, 0), (1, 1)]), sampling="rejection")
+
+    with pytest.raises(ImportError, match="requires shapely >= 2.1"):
+        ShapelyGeolocation(Polygon([(0, 0), (1, 0), (1, 1)]), sampling="triangulation")
+
+
+def test_shapely_geolocation_raises_error_for_invalid_sampling_mode():
+    with pytest.raises(ValueError, match="Argument 'sampling' must be one of"):
+        ShapelyGeolocation(Polygon([(0, 0), (1, 0), (1, 1)]), sampling="foobar")
+
+
+def test_geojson_geolocation_chooses_same_features_as_numpy_choice():
+    g = GeoJSONGeolocation(geojson_sample_file, sampling="triangulation")
+    random_state = np.random.RandomState(seed=12345)
+    g.shape_gen_chooser.seed(12345)
+
+    indices_expected = [random_state.choice(len(g.shape_gens), p=g.choice_probs) for _ in range(500)]
+    indices = g._choose_shape_gen_indices(500)
+
+    assert indices.tolist() == indices_expected
+
+
+@pytest.mark.parametrize("p", [None, [0.1, 0.3, 0.2, 0.15, 0.25], [1, 0, 0, 5, 2]])
+def test_select_one_with_constant_values_selects_same_elements_as_random_choices(p):
+    values = ["a", "b", "c", "d", "e"]
+    randgen = Random(12345)
+    items_expected = [randgen.choices(values, weights=p)[0] for _ in range(200)]
+
+    g = SelectOne(values, p=p).reset(seed=12345)
+    items = [next(g) for _ in range(100)] + g.next_batch(100)
+
+    assert items == items_expected
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_select_one_returns_indices_of_selected_elements(exact):
+    values = ["a", "b", "c", "d", "e"]
+    g = SelectOne(values, p=[0, 1, 0, 3, 0]).reset(seed=12345)
+    indices = g.next_batch_indices(1000, exact=exact)
+
+    assert set(indices.tolist()) == {1, 3}
+    assert 650 < np.count_nonzero(indices == 3) < 850
+
+
+def test_select_one_does_not_support_indices_for_non_constant_values():
+    g = SelectOne(SelectMultiple(["a", "b", "c"], num=2))
+    with pytest.raises(TypeError, match="only supported if both `values` and `p` are constant"):
+        g.next_batch_indices(10)
+
+
+def test_select_multiple_returns_indices_of_same_elements_as_next():
+    values = ["a", "b", "c", "d", "e", "f", "g"]
+    g = SelectMultiple(values, num=Integer(0, 7))
+
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+    items_expected = [next(g) for _ in range(100)]
+
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+    indices, offsets = g.next_batch_indices(100)
+
+    assert offsets.shape == (101,)
+    items = [[values[idx] for idx in indices[start:end]] for start, end in zip(offsets[:-1], offsets[1:])]
+    assert items == items_expected
+
+
+@pytest.mark.parametrize("num_values, num", [(3000, Integer(0, 20)), (10, Integer(0, 10)), (10, 4)])
+def test_inexact_batch_generation_in_select_multiple_selects_distinct_elements(num_values, num):
+    g = SelectMultiple(list(range(num_values)), num=num).reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+    indices, offsets = g.next_batch_indices(2000, exact=False)
+
+    rows = [indices[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
+    assert len(rows) == 2000
+    assert all(len(set(row)) == len(row) for row in rows)
+    assert indices.min() >= 0 and indices.max() < num_values
+
+
+def test_inexact_batch_generation_in_select_multiple_is_uniform():
+    g = SelectMultiple(list(range(10)), num=4).reset(seed=12345)
+    indices, _ = g.next_batch_indices(50_000, exact=False)
+
+    first_elements = indices.reshape(-1, 4)[:, 0]
+    assert np.allclose(np.bincount(indices) / len(indices), 0.1, atol=0.01)
+    assert np.allclose(np.bincount(first_elements) / len(first_elements), 0.1, atol=0.01)
+
+
+def test_select_multiple_raises_error_if_sample_is_larger_than_population():
+    g = SelectMultiple(["a", "b", "c"], num=5)
+    with pytest.raises(ValueError, match="Sample larger than population"):
+        g.next_batch_indices(10, exact=False)
+
+
+def test_select_multiple_does_not_support_indices_for_non_constant_values():
+    g = SelectMultiple(SelectMultiple(["a", "b", "c"], num=2), num=1)
+    with pytest.raises(TypeError, match="only supported if `values` is a constant sequence"):
+        g.next_batch_indices(10)
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_select_multiple_from_numpy_array_raises_same_error_in_batches_as_in_next(exact):
+    g = SelectMultiple(np.array(["a", "b", "c", "d"]), num=2)
+
+    with pytest.raises(TypeError):
+        next(g)
+    with pytest.raises(TypeError):
+        g.generate(10, seed=12345, exact=exact)
+    with pytest.raises(TypeError, match="only supported if `values` is a constant sequence"):
+        g.next_batch_indices(10)
+
+
+def test_inexact_batch_generation_in_select_multiple_from_looked_up_numpy_arrays_raises_error():
+    mapping = {"A": np.array(["a", "aa", "aaa"]), "B": np.array(["b", "bb", "bbb"])}
+    g = SelectMultiple(Lookup(SelectOne(["A", "B"]), mapping=mapping), num=2)
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+
+    with pytest.raises(TypeError):
+        g.next_batch(10, exact=False)
+
+
+@pytest.mark.parametrize("mapping, keys", [
+    ({3: "a", 1: "b", 2: "c", 7: "d"}, np.array([1, 7, 3, 3, 2])),
+    ({3: "a", 1: "b", 2: "c", 7: "d"}, [1, 7, 3, 3, 2]),
+    ({"x": "a", "y": "b", ("z", 1): "c", 10**12: "d"}, ["y", 10**12, ("z", 1), "x"]),
+])
+def test_lookup_finds_positions_of_keys_in_constant_mapping(mapping, keys):
+    g = Lookup(Integer(1, 3), mapping=mapping)
+    positions = g.lookup_positions(keys)
+
+    assert [list(mapping.values())[pos] for pos in positions] == [mapping[key] for key in keys]
+
+
+@pytest.mark.parametrize("keys", [np.array([1, 2, 5]), ["x", "y"]])
+def test_lookup_raises_key_error_for_missing_keys(keys):
+    g = Lookup(Integer(1, 3), mapping={1: "a", 2: "b", "x": "c"})
+    with pytest.raises(KeyError):
+        g.lookup_positions(keys)
+
+
+def test_lookup_with_constant_mapping_produces_same_items_in_batch():
+    mapping = {"A": 1, "B": 2, "C": 3}
+    g = Lookup(SelectOne(["A", "B", "C"]), mapping=mapping)
+
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+    items_expected = [next(g) for _ in range(100)]
+
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+    assert g.next_batch(100) == items_expected
+
+
+@pytest.mark.parametrize("mapping", [
+    defaultdict(lambda: "default", {"A": "a", "B": "b"}),
+    Counter({"A": 3, "B": 5}),
+])
+def test_lookup_with_dictionary_subclass_uses_its_lookup_for_missing_keys(mapping):
+    g = Lookup(SelectOne(["A", "B", "C"]), mapping=mapping)
+
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+    items_expected = [next(g) for _ in range(50)]
+
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+    assert g.next_batch(50) == items_expected
+    assert mapping["C"] in items_expected
+
+
+def test_lookup_with_constant_mapping_reflects_modifications_of_the_mapping():
+    mapping = {"A": 1, "B": 2}
+    g = Lookup(SelectOne(["A", "B"]), mapping=mapping).reset(seed=12345)
+    assert set(g.next_batch(50)) == {1, 2}
+
+    mapping["B"] = 20
+    assert set(g.next_batch(50)) == {1, 20}
+
+    del mapping["A"]
+    mapping["A"] = 10
+    assert set(g.next_batch(50)) == {10, 20}
+
+
+def test_lookup_does_not_support_positions_for_non_dictionary_mapping():
+    g = Lookup(Integer(0, 2), mapping=["a", "b", "c"])
+    with pytest.raises(TypeError, match="only supported if the mapping is a constant dictionary"):
+        g.next_batch_positions(10)
+
+
+def test_inexact_batch_generation_in_select_multiple_selects_from_looked_up_pools():
+    mapping = {"A": ["a", "aa", "aaa"], "B": ["b", "bb", "bbb", "bbbb", "bbbbb"]}
+    g = SelectMultiple(Lookup(SelectOne(["A", "B"]), mapping=mapping), num=Integer(1, 3))
+    g.reset(seed=12345)
+    g.reset_input_generators(seed=33333)
+
+    items = g.next_batch(500, exact=False)
+    assert len(items) == 500
+    assert all(1 <= len(x) <= 3 and len(set(x)) == len(x) for x in items)
+    assert all(set(x) <= set(mapping["A"]) or set(x) <= set(mapping["B"]) for x in items)
+    assert {x[0][0] for x in items} == {"a", "b"}
+
+
+def test_generate_falls_back_to_scalar_generation_if_batch_is_not_supported():
+    g = ScalarOnlyGenerator()
+    h = Apply(lambda x, y: (x, y), g, Integer(1, 5))
+    assert not g.supports_batch
+    assert not h.supports_batch
+
+    assert list(g.generate(num=5, seed=12345)) == [1, 2, 3, 4, 5]
+    assert list(g.next_batch(3)) == [6, 7, 8]
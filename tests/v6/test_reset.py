@@ -1,9 +1,11 @@
+import numpy as np
 import pytest
 from unittest.mock import Mock
 from .exemplar_generators import EXEMPLAR_GENERATORS, EXEMPLAR_PRIMITIVE_GENERATORS, EXEMPLAR_DERIVED_GENERATORS, EXEMPLAR_CUSTOM_GENERATORS
 
 from .context import tohu
-from tohu.v6.primitive_generators import Constant
+from tohu.v6.base import SeedGenerator
+from tohu.v6.primitive_generators import Constant, Integer
 
 
 @pytest.mark.parametrize("g", EXEMPLAR_GENERATORS)
@@ -109,3 +111,56 @@ def test_custom_generators_return_consistent_values_when_reset(g):
     assert items3 == items4
 
     assert items1 != items3
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_CUSTOM_GENERATORS)
+def test_custom_generators_can_be_reset_with_seed_sequence(g):
+    """
+    Custom generators accept a numpy SeedSequence as the seed and produce
+    the same items when reset with the same seed sequence again.
+    """
+    seed_seq = np.random.SeedSequence(12345)
+
+    items1 = list(g.generate(num=10, seed=seed_seq))
+    items2 = list(g.generate(num=10, seed=seed_seq))
+    items3 = list(g.generate(num=10, seed=np.random.SeedSequence(99999)))
+
+    assert items1 == items2
+    assert items1 != items3
+
+
+def test_seed_generator_derives_seeds_from_child_seed_sequences():
+    seed_seq = np.random.SeedSequence(12345)
+    seed_gen = SeedGenerator().reset(seed_seq)
+
+    seeds = [next(seed_gen) for _ in range(5)]
+    seeds_expected = np.random.SeedSequence(12345).spawn(5)
+
+    assert [s.spawn_key for s in seeds] == [s.spawn_key for s in seeds_expected]
+    assert [s.generate_state(4).tolist() for s in seeds] == [s.generate_state(4).tolist() for s in seeds_expected]
+    assert seed_seq.n_children_spawned == 0
+
+
+def test_seed_generators_produce_different_seeds_for_spawned_seed_sequences():
+    shard_seeds = np.random.SeedSequence(12345).spawn(3)
+    seeds = [tuple(int(next(seed_gen).generate_state(1)[0]) for _ in range(5))
+             for seed_gen in (SeedGenerator().reset(s) for s in shard_seeds)]
+
+    assert len(set(seeds)) == 3
+
+
+def test_numpy_random_streams_are_seeded_with_child_seed_sequences():
+    g = Integer(0, 10**9).reset(np.random.SeedSequence(12345))
+    items = g.next_batch(10, exact=False)
+
+    child_seq = np.random.SeedSequence(12345).spawn(1)[0]
+    items_expected = np.random.default_rng(child_seq).integers(0, 10**9, size=10, endpoint=True)
+
+    assert items.tolist() == items_expected.tolist()
+
+
+@pytest.mark.parametrize("g", EXEMPLAR_PRIMITIVE_GENERATORS)
+def test_primitive_generators_can_be_reset_with_seed_sequence(g):
+    items1 = list(g.generate(num=10, seed=np.random.SeedSequence(12345)))
+    items2 = list(g.generate(num=10, seed=np.random.SeedSequence(12345)))
+    assert items1 == items2
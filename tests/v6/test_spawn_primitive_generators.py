@@ -1,5 +1,9 @@
 import pytest
 from .exemplar_generators import EXEMPLAR_PRIMITIVE_GENERATORS
+from .exemplar_generators.exemplar_primitive_generators import geojson_sample_file
+
+from .context import tohu
+from tohu.v6.primitive_generators import GeoJSONGeolocation
 
 
 @pytest.mark.parametrize("g", EXEMPLAR_PRIMITIVE_GENERATORS)
@@ -26,4 +30,31 @@ def test_spawn_primitive_generators(g):
     # Verify that the items generated by h after spawning
     # as well as the full sets of items are identical.
     assert items_h_post_spawn == items_g_post_spawn
-    assert items_h_all == items_g_pre_spawn + items_g_post_spawn
\ No newline at end of file
+    assert items_h_all == items_g_pre_spawn + items_g_post_spawn
+
+@pytest.mark.parametrize("sampling", ["rejection", "triangulation"])
+def test_spawned_geojson_geolocation_shares_geometry_with_original(sampling):
+    """
+    Test that spawning a GeoJSONGeolocation generator re-uses its shapes and item classes.
+    """
+    g = GeoJSONGeolocation(geojson_sample_file, include_attributes=['name'], sampling=sampling)
+    h = g.spawn()
+
+    assert len(h.shape_gens) == len(g.shape_gens)
+    for sg_g, sg_h in zip(g.shape_gens, h.shape_gens):
+        assert sg_h is not sg_g
+        assert sg_h.shape is sg_g.shape
+        assert sg_h.geolocation_cls is sg_g.geolocation_cls
+        assert sg_h.triangles is sg_g.triangles
+        assert sg_h.lon_gen is not sg_g.lon_gen
+
+
+def test_geolocations_of_all_features_share_the_same_item_class():
+    g = GeoJSONGeolocation(geojson_sample_file, include_attributes=['name'])
+    sg_1, sg_2 = g.shape_gens[:2]
+    assert sg_1.geolocation_cls.func is sg_2.geolocation_cls.func
+    assert sg_1.geolocation_cls.keywords != sg_2.geolocation_cls.keywords
+
+    items = g.generate(num=20, seed=12345)
+    assert len(set(type(x) for x in items)) == 1
+    assert all(isinstance(x.name, str) for x in items)
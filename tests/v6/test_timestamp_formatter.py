@@ -0,0 +1,47 @@
+import datetime as dt
+import numpy as np
+import pytest
+
+from .context import tohu
+from tohu.v6.primitive_generators import Date, Timestamp
+from tohu.v6.utils import TimestampFormatter, is_date_only_format
+
+
+@pytest.mark.parametrize("fmt, expected", [
+    ("%Y-%m-%d", True),
+    ("%d %b %Y (%a)", True),
+    ("%%H %Y", True),
+    ("%Y-%m-%d %H:%M:%S", False),
+    ("%c", False),
+])
+def test_is_date_only_format(fmt, expected):
+    assert is_date_only_format(fmt) == expected
+
+
+@pytest.mark.parametrize("start, interval, unit, fmt, num_keys, use_lookup_table", [
+    (dt.date(2018, 1, 1), 364, "D", "%d/%m/%Y", 365, True),
+    (dt.date(1000, 1, 1), 365_000, "D", "%d/%m/%Y", 365_001, False),
+    (dt.datetime(2018, 1, 1, 22, 0, 0), 4 * 3600, "s", "%d/%m/%Y", 2, True),
+    (dt.datetime(2018, 1, 1, 22, 0, 0), 4 * 3600, "s", "%H:%M:%S", 4 * 3600 + 1, False),
+])
+def test_timestamp_formatter_produces_same_values_as_strftime(start, interval, unit, fmt, num_keys, use_lookup_table):
+    formatter = TimestampFormatter(fmt, uppercase=False, start=start, interval=interval, unit=unit)
+    assert formatter.num_keys == num_keys
+    assert formatter.use_lookup_table == use_lookup_table
+
+    offsets = np.random.RandomState(12345).randint(0, interval + 1, size=500)
+    delta = dt.timedelta(seconds=1) if unit == "s" else dt.timedelta(days=1)
+    expected = [(start + int(offset) * delta).strftime(fmt) for offset in offsets]
+
+    assert [formatter.format_offset(int(offset)) for offset in offsets] == expected
+    assert formatter.format_offsets(offsets).tolist() == expected
+
+
+def test_spawned_generators_share_the_timestamp_formatter():
+    g = Date(start="2018-01-01", end="2018-12-31", fmt="%d/%m/%Y")
+    h = g.spawn()
+    assert h._timestamp_formatter is g._timestamp_formatter
+
+    g = Timestamp(start="2018-01-01 11:22:33", end="2018-12-31 20:00:00", fmt="%d/%m/%Y")
+    h = g.spawn()
+    assert h._timestamp_formatter is g._timestamp_formatter
@@ -1,4 +1,5 @@
 import datetime as dt
+import pandas as pd
 import pytest
 
 from .context import tohu
@@ -98,3 +99,45 @@ def test_expected_start_and_end_value(start, end, date, start_expected, end_expe
 def test_invalid_input_combinations(start, end, date):
     with pytest.raises(TohuTimestampError):
         Timestamp(start=start, end=end, date=date)
+
+
+@pytest.mark.parametrize("start, end, fmt, uppercase", [
+    ("2018-01-01 11:22:33", "2019-04-12 20:00:05", None, None),
+    ("2018-01-01 11:22:33", "2019-04-12 20:00:05", "%Y-%m-%d %H:%M:%S", False),
+    ("2018-01-01 11:22:33", "2019-04-12 20:00:05", "%Y-%m-%dT%H:%M", False),
+    ("2018-01-01 11:22:33", "2019-04-12 20:00:05", "%d %b %Y, %H:%M", True),
+    ("0999-12-31 11:22:33", "1000-01-01 20:00:05", "%Y-%m-%d %H:%M:%S", False),
+])
+def test_next_batch_produces_same_timestamps_as_next(start, end, fmt, uppercase):
+    g = Timestamp(start=start, end=end, fmt=fmt, uppercase=uppercase)
+
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(100)]
+
+    g.reset(seed=12345)
+    items = g.next_batch(100)
+
+    assert items == items_expected
+
+
+@pytest.mark.parametrize("start, end", [
+    (pd.Timestamp("2018-01-01 11:22:33"), pd.Timestamp("2019-04-12 20:00:05")),
+    (dt.datetime(2018, 1, 1, 11, 22, 33, tzinfo=dt.timezone.utc), dt.datetime(2019, 4, 12, 20, 0, 5, tzinfo=dt.timezone.utc)),
+])
+def test_next_batch_produces_timestamps_of_same_type_as_next(start, end):
+    g = Timestamp(start=start, end=end)
+
+    g.reset(seed=12345)
+    items_expected = [next(g) for _ in range(100)]
+
+    g.reset(seed=12345)
+    items = g.next_batch(100)
+
+    assert items == items_expected
+    assert [type(x) for x in items] == [type(x) for x in items_expected]
+
+
+def test_inexact_batch_generation_of_timestamps():
+    g = Timestamp(start="2018-01-01 11:22:33", end="2018-01-01 11:22:40", fmt="%Y-%m-%d %H:%M:%S")
+    items = g.reset(seed=12345).next_batch(1000, exact=False)
+    assert set(items) == {f"2018-01-01 11:22:{x}" for x in range(33, 41)}
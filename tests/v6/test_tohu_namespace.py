@@ -144,3 +144,20 @@ def test_spawning_of_namespace_with_complex_dependencies():
     assert len(ns_spawned) == 5
     assert ns_spawned["bb"].input_generators[0].input_generators[0] is ns_spawned["xx"]
     assert ns_spawned["bb"].input_generators[1] is ns_spawned["aa"]
+
+
+def test_names_and_named_generators_exclude_anonymous_generators():
+    xx = Integer(1, 3)
+    h = Lookup(xx, mapping={1: 'a', 2: 'b', 3: 'c'})
+
+    ns = TohuNamespace()
+    ns["bb"] = h
+    ns["aa"] = xx
+    assert len(ns) == 4
+    assert ns.names == ["bb", "aa"]
+    assert ns.named_generators == {"bb": h, "aa": ns["aa"]}
+    assert ns[None] is xx
+    assert ns["aa"].parent is xx
+
+    with pytest.raises(KeyError):
+        ns["cc"]
@@ -121,3 +121,25 @@ def test_add_alias_for_another_field_generator():
     field_gen_aa = ns.field_generators["aa"]
     field_gen_bb = ns.field_generators["bb"]
     assert field_gen_bb.is_clone_of(field_gen_aa)
+
+
+def test_find_existing_name_after_replacing_field_generator():
+    g1 = Integer(100, 200)
+    g2 = HashDigest(length=6)
+    ns = TohuNamespace("Quux")
+    ns.add_field_generator("aa", g1)
+    ns.add_field_generator("bb", g1)
+    ns.add_field_generator("aa", g2)
+    assert ns.field_names == ["aa", "bb"]
+    assert ns.find_existing_name(g1) is None
+    assert ns.find_existing_name(g2) == "aa"
+
+
+def test_namespaces_with_same_fields_share_the_same_tohu_items_class():
+    ns1 = TohuNamespace("Quux")
+    ns2 = TohuNamespace("Quux")
+    for ns in [ns1, ns2]:
+        ns.add_field_generator("aa", Integer(100, 200))
+        ns.add_field_generator("bb", HashDigest(length=8))
+    assert ns1.tohu_items_cls is ns2.tohu_items_cls
+    assert ns1.tohu_items_cls.field_names == ["aa", "bb"]
@@ -0,0 +1,47 @@
+"""
+Process-wide cache of the item classes created by custom generators
+(and other generators which produce attrs-based items, such as the
+geolocation generators).
+
+Creating these classes with `attr.make_class()` is expensive, so they
+are created only once for each combination of class name and field
+names. This also means that generators with the same fields (e.g. a
+custom generator and its spawns) produce items of the same type, which
+makes comparing them much cheaper.
+"""
+
+__all__ = ['clear_items_class_cache', 'get_items_class']
+
+_ITEMS_CLASSES = {}
+
+
+def get_items_class(kind, clsname, field_names, make_items_class):
+    """
+    Return the item class with the given name and field names, creating it
+    via `make_items_class(clsname, field_names)` if it doesn't exist yet.
+
+    Parameters
+    ----------
+    kind: string
+        Identifies the type of item class (e.g. 'tohu.v6'), so that different
+        implementations with the same class name and fields don't collide.
+    clsname: string
+        Name of the item class.
+    field_names: sequence of strings
+        Names of the fields of the item class.
+    make_items_class: callable
+        Function which creates the item class.
+    """
+    key = (kind, clsname, tuple(field_names))
+    try:
+        return _ITEMS_CLASSES[key]
+    except KeyError:
+        # Use setdefault() so that concurrent callers end up with the same class.
+        return _ITEMS_CLASSES.setdefault(key, make_items_class(clsname, list(field_names)))
+
+
+def clear_items_class_cache():
+    """
+    Remove all cached item classes.
+    """
+    _ITEMS_CLASSES.clear()
@@ -1,14 +1,33 @@
 import hashlib
+import numpy as np
 
 from abc import ABCMeta, abstractmethod
 from itertools import islice
 from random import Random
 from tqdm import tqdm
+from weakref import WeakSet
 
 from .item_list import ItemList
 from .logging import logger
+from .utils import concatenate_columns
 
-__all__ = ['SeedGenerator', 'TohuBaseGenerator', 'PrimitiveGenerator']
+__all__ = ['SeedGenerator', 'TohuBaseGenerator', 'PrimitiveGenerator', 'SharedValueClone']
+
+BATCH_PROGRESSBAR_CHUNK_SIZE = 10_000
+
+
+def as_integer_seed(seed):
+    """
+    Return a 32-bit integer seed derived from `seed` if it is a
+    `numpy.random.SeedSequence`, otherwise return `seed` unchanged.
+
+    This allows generators which seed Python's `random.Random` (or
+    numpy's legacy `RandomState`) directly to accept seed sequences.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return int(seed.generate_state(1, dtype=np.uint32)[0])
+    else:
+        return seed
 
 
 class SeedGenerator:
@@ -18,6 +37,22 @@ class SeedGenerator:
     generators can be re-initialised with a different seed in a
     reproducible way.
 
+    The seed passed to `reset()` can either be an integer (or anything
+    else accepted by `random.seed()`), in which case the seeds are drawn
+    from a Mersenne Twister, or a `numpy.random.SeedSequence`. In the
+    latter case the i-th seed is the i-th child sequence (with spawn key
+    `seed_seq.spawn_key + (i,)`, i.e. the same child that `seed_seq.spawn()`
+    would create). Generators pass these child sequences directly to
+    `numpy.random.default_rng()`, but the ones which use Python's `random`
+    module (or numpy's legacy `RandomState`) reduce them to 32-bit integer
+    seeds (see `as_integer_seed()`). So this doesn't provide any stronger
+    guarantees about the independence of the constituent generators than
+    integer seeds do. However, it makes it easy to split the generation
+    across processes or shards in a reproducible way, e.g.:
+
+        for shard_seed in np.random.SeedSequence(12345).spawn(num_shards):
+            items = g.generate(N, seed=shard_seed)
+
     Note: This is almost identical to the `tohu.Integer` generator, but we
     need a version which does *not* inherit from `TohuBaseGenerator`,
     otherwise the automatic item class creation in custom generators
@@ -28,19 +63,97 @@ class SeedGenerator:
         self.randgen = Random()
         self.minval = 0
         self.maxval = 2**32 - 1
+        self.seed_seq = None
+        self.num_seeds_drawn = 0
 
     def reset(self, seed):
-        self.randgen.seed(seed)
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_seq = seed
+            self.num_seeds_drawn = 0
+        else:
+            self.seed_seq = None
+            self.randgen.seed(seed)
         return self
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        return self.randgen.randint(self.minval, self.maxval)
+        if self.seed_seq is None:
+            return self.randgen.randint(self.minval, self.maxval)
+
+        # Derive the child sequence directly rather than calling `seed_seq.spawn()`,
+        # which would modify the (user-supplied) seed sequence and make subsequent
+        # resets with the same seed sequence produce different seeds.
+        child_seq = np.random.SeedSequence(
+            self.seed_seq.entropy,
+            spawn_key=self.seed_seq.spawn_key + (self.num_seeds_drawn,),
+            pool_size=self.seed_seq.pool_size,
+        )
+        self.num_seeds_drawn += 1
+        return child_seq
 
     def _set_random_state_from(self, other):
         self.randgen.setstate(other.randgen.getstate())
+        self.seed_seq = other.seed_seq
+        self.num_seeds_drawn = other.num_seeds_drawn
+
+
+class InexactValueStream:
+    """
+    Stream of the elements which a generator produces in inexact mode (see
+    `TohuBaseGenerator._set_exact_mode()`). The elements are drawn in blocks
+    by calling `draw(num)`, where `num` is a multiple of `BLOCK_SIZE`. This
+    must return a NumPy array containing `num` elements (along its first
+    axis) and must produce the same elements no matter how the blocks are
+    split up into separate calls.
+
+    Elements which have been drawn but not yet used are buffered, so that
+    `next()` and `next_batch()` read their elements from the same stream.
+    """
+
+    BLOCK_SIZE = 1024
+
+    def __init__(self, draw):
+        self.draw = draw
+        self.clear()
+
+    def clear(self):
+        self.block = None
+        self.pos = 0
+
+    @property
+    def num_buffered(self):
+        return 0 if self.block is None else len(self.block) - self.pos
+
+    def next_value(self):
+        if self.num_buffered == 0:
+            self.block = self.draw(self.BLOCK_SIZE)
+            self.pos = 0
+        value = self.block[self.pos]
+        self.pos += 1
+        return value
+
+    def next_values(self, num):
+        num_buffered = self.num_buffered
+        if num <= num_buffered:
+            values = self.block[self.pos:self.pos + num]
+            self.pos += num
+            return values
+
+        num_missing = num - num_buffered
+        new_values = self.draw(-(-num_missing // self.BLOCK_SIZE) * self.BLOCK_SIZE)
+        values = new_values[:num_missing]
+        if num_buffered > 0:
+            values = np.concatenate([self.block[self.pos:], values])
+        # Copy the unused elements so that we don't keep the whole array alive.
+        self.block = new_values[num_missing:].copy()
+        self.pos = 0
+        return values
+
+    def _set_state_from(self, other):
+        self.block = None if other.block is None else other.block.copy()
+        self.pos = other.pos
 
 
 class TohuCloneError(Exception):
@@ -54,6 +167,37 @@ class TohuBaseGenerator(metaclass=ABCMeta):
     Base class for all of tohu's generators.
     """
 
+    # Indicates whether generate() may produce items via next_batch()
+    # instead of calling __next__ once per item. Subclasses should only
+    # set this to True if producing a batch of items in one go (which for
+    # derived and custom generators means consuming the input generators
+    # column-by-column rather than row-by-row) yields the same items.
+    supports_batch = False
+
+    # Indicates whether clones of this generator may read its values from
+    # a shared buffer (see `SharedValueClone`) rather than re-computing
+    # them. This is not worth it for generators whose values are trivial
+    # to produce and which other generators inspect directly (`Constant`).
+    supports_shared_clones = True
+
+    # Buffer of the values read by this generator's shared-value clones.
+    # This is created when the first shared-value clone is made.
+    _shared_value_buffer = None
+
+    # If True, `clone()` returns shared-value clones of this generator. This
+    # is set by `TohuNamespace.spawn(shared_clones=True)` on the generators
+    # it creates (which is used by custom generators with `__shared_clones__`).
+    use_shared_clones = False
+
+    # True for clones created by `clone()`, which behave exactly like their
+    # parent. Other generators may register themselves as clones, too, even
+    # though they are configured differently (e.g. `Timestamp.strftime()`).
+    is_exact_clone = False
+
+    # If False, generators which draw from a different random stream in inexact
+    # batch generation (see `next_batch()`) use this stream in `next()`, too.
+    exact_mode = True
+
     def __init__(self, *args, **kwargs):
         self.tohu_name = None
         self.owner = None
@@ -105,6 +249,42 @@ class TohuBaseGenerator(metaclass=ABCMeta):
     def __next__(self):
         raise NotImplementedError(f"Class {self.__class__.__name__} does not implement method '__next__'.")
 
+    def next_batch(self, num, *, exact=True):
+        """
+        Return a sequence (list or NumPy array) of the next `num` elements.
+
+        This default implementation simply calls `__next__` repeatedly.
+        Subclasses can override it with a faster vectorised version.
+
+        Parameters
+        ----------
+        num: integer
+            Number of elements to produce.
+        exact: bool
+            If True (the default), the elements must be identical to the
+            ones produced by calling `next()` on this generator `num` times.
+            If False, generators may use faster batch implementations which
+            are reproducible (i.e. depend only on the seed) but draw from a
+            different random stream than the scalar `__next__` method (unless
+            the generator is in inexact mode, see `_set_exact_mode()`).
+        """
+        return [next(self) for _ in range(num)]
+
+    def _set_exact_mode(self, exact):
+        """
+        Set whether this generator (and its clones) produces the elements of exact
+        or inexact batch generation, both in `next()` and in `next_batch()`.
+
+        This is called by `generate()` before resetting the generator, so that
+        generators which consume elements of a clone during a reset (such as
+        `Cumsum`) see the same elements as the other clones do in the batches
+        produced afterwards. Generators with a separate random stream for inexact
+        batches override this method to set `exact_mode`; generators which reset
+        other generators explicitly should also pass the mode on to them.
+        """
+        for c in self.clones:
+            c._set_exact_mode(exact)
+
     @property
     def max_value(self):
         return self._max_value
@@ -125,28 +305,58 @@ class TohuBaseGenerator(metaclass=ABCMeta):
         logger.debug(f'Resetting {self} (seed={seed})')
         self.seed_generator.reset(seed)
 
+        if self._shared_value_buffer is not None:
+            self._shared_value_buffer.reset()
+
         for c in self.clones:
             c.reset(seed)
 
-    def generate(self, num, *, seed=None, progressbar=False):
+    def generate(self, num, *, seed=None, progressbar=False, exact=True):
         """
         Return sequence of `num` elements.
 
         If `seed` is not None, the generator is reset
         using this seed before generating the elements.
+
+        If this generator (and all generators it depends on) supports
+        batch generation, the elements are produced via `next_batch()`.
+        The `exact` argument is passed on to `next_batch()`; if it is
+        True (the default), the result is identical to the elements
+        produced by calling `next()` repeatedly.
         """
+        self._set_exact_mode(exact)
         if seed is not None:
             self.reset(seed)
 
-        items = islice(self, num)
-        if progressbar:
-            items = tqdm(items, total=num)
+        if self.supports_batch:
+            item_list = self._generate_batched(num, exact=exact, progressbar=progressbar)
+        else:
+            items = islice(self, num)
+            if progressbar:
+                items = tqdm(items, total=num)
 
-        item_list = [x for x in items]
+            item_list = [x for x in items]
 
         #logger.warning("TODO: initialise ItemList with random seed!")
         return ItemList(item_list, num)
 
+    def _generate_batched(self, num, *, exact, progressbar):
+        """
+        Helper method which produces `num` elements via `next_batch()`.
+        If `progressbar` is True, the elements are produced in chunks
+        so that the progress bar can be updated in between.
+        """
+        if not progressbar:
+            return list(self.next_batch(num, exact=exact))
+
+        item_list = []
+        with tqdm(total=num) as pbar:
+            while len(item_list) < num:
+                chunk_size = min(BATCH_PROGRESSBAR_CHUNK_SIZE, num - len(item_list))
+                item_list.extend(self.next_batch(chunk_size, exact=exact))
+                pbar.update(chunk_size)
+        return item_list
+
     @abstractmethod
     def _set_random_state_from(self, other):
         logger.debug(f"Setting internal state of {self} (from {other})")
@@ -161,8 +371,16 @@ class TohuBaseGenerator(metaclass=ABCMeta):
         Return an exact copy of this generator which behaves the same way
         (i.e., produces the same elements in the same order) and which is
         automatically reset whenever the original generator is reset.
+
+        If `use_shared_clones` is True, the clone does not re-compute the
+        elements but reads them from a buffer shared with the original
+        generator (see `SharedValueClone`).
         """
-        c = self.spawn()
+        if self.use_shared_clones and self.supports_shared_clones:
+            c = SharedValueClone(self)
+        else:
+            c = self.spawn()
+        c.is_exact_clone = True
         self.register_clone(c)
         c.register_parent(self)
         return c
@@ -190,4 +408,229 @@ class TohuBaseGenerator(metaclass=ABCMeta):
 class PrimitiveGenerator(TohuBaseGenerator):
     """
     Base class for all primitive generators
-    """
\ No newline at end of file
+    """
+
+    supports_batch = True
+
+
+class SharedValueBuffer:
+    """
+    Buffer holding the elements produced by a generator which have not yet
+    been read by all of its shared-value clones (see `SharedValueClone`).
+
+    The elements are stored in chunks (as returned by `next()` or by
+    `next_batch()`), together with the position of the first element of
+    each chunk in the generator's output stream. Each clone keeps track of
+    its own position in this stream, and chunks are discarded once all
+    clones have read past them.
+    """
+
+    MIN_TRIM_SIZE = 1024
+
+    def __init__(self, producer):
+        self.producer = producer
+        self.readers = WeakSet()
+        self.reset()
+
+    def __repr__(self):
+        return f"<SharedValueBuffer: {self.num_buffered} elements of {self.producer}>"
+
+    def reset(self):
+        self.chunks = []  # list of pairs [start_position, elements]
+        self.end = 0  # position of the next element which the producer will produce
+        self._scalar_chunk = None  # chunk to which single elements produced by `next()` are appended
+        self._trim_size = self.MIN_TRIM_SIZE
+
+        for reader in self.readers:
+            reader.position = 0
+
+    def register_reader(self, reader):
+        self.readers.add(reader)
+
+    def unregister_reader(self, reader):
+        self.readers.discard(reader)
+
+    @property
+    def num_buffered(self):
+        return self.end - self.chunks[0][0] if self.chunks else 0
+
+    def _trim(self):
+        """
+        Discard all elements which have been read by all readers.
+        """
+        min_position = min((reader.position for reader in self.readers), default=self.end)
+
+        while self.chunks and self.chunks[0][0] + len(self.chunks[0][1]) <= min_position:
+            del self.chunks[0]
+
+        if self.chunks and self.chunks[0][1] is self._scalar_chunk and self.chunks[0][0] < min_position:
+            del self._scalar_chunk[:min_position - self.chunks[0][0]]
+            self.chunks[0][0] = min_position
+
+        if self.chunks == [] or self.chunks[-1][1] is not self._scalar_chunk:
+            self._scalar_chunk = None
+
+        # Only trim again once the buffer has doubled in size, so that
+        # the cost of trimming is amortised over the elements produced.
+        self._trim_size = max(self.MIN_TRIM_SIZE, 2 * self.num_buffered)
+
+    def next_value(self, reader):
+        """
+        Return the element at the reader's position and advance the reader.
+        """
+        pos = reader.position
+        if pos == self.end:
+            if self.num_buffered > self._trim_size:
+                self._trim()
+            if self._scalar_chunk is None:
+                self._scalar_chunk = []
+                self.chunks.append([self.end, self._scalar_chunk])
+            value = next(self.producer)
+            self._scalar_chunk.append(value)
+            self.end += 1
+        else:
+            for start, values in reversed(self.chunks):
+                if pos >= start:
+                    value = values[pos - start]
+                    break
+
+        reader.position = pos + 1
+        return value
+
+    def next_values(self, reader, num, *, exact=True):
+        """
+        Return the `num` elements starting at the reader's position and advance the reader.
+        """
+        pos = reader.position
+        stop = pos + num
+        if stop > self.end:
+            if self.num_buffered > self._trim_size:
+                self._trim()
+            values = self.producer.next_batch(stop - self.end, exact=exact)
+            self.chunks.append([self.end, values])
+            self.end += len(values)
+            self._scalar_chunk = None
+
+        reader.position = stop
+        parts = [values[max(pos - start, 0):stop - start]
+                 for start, values in self.chunks if start < stop and start + len(values) > pos]
+        if len(parts) == 1:
+            return parts[0]
+        else:
+            return concatenate_columns(parts)
+
+    def _set_state_from(self, other):
+        self.chunks = []
+        self._scalar_chunk = None
+        for start, values in other.chunks:
+            if values is other._scalar_chunk:
+                # The scalar chunk is extended in place, so it must not be shared between buffers.
+                values = list(values)
+                self._scalar_chunk = values
+            self.chunks.append([start, values])
+        self.end = other.end
+        self._trim_size = other._trim_size
+
+
+class SharedValueClone(TohuBaseGenerator):
+    """
+    Clone of a generator which does not re-compute the elements of the
+    original generator but reads them from a buffer shared between the
+    original and all of its shared-value clones. This means each element
+    is only computed once, no matter how many clones there are (which
+    is useful for derived generators whose inputs are expensive to
+    compute, e.g. chains of `Apply` or `Lookup` generators).
+
+    The elements are produced by the original generator on demand when
+    the first clone reads them and are kept in the buffer until every clone
+    has read them. Therefore the original generator must not be consumed
+    directly once it has shared-value clones (all consumers should read
+    through a clone), and clones which consume elements at very different
+    rates cause the buffer to grow accordingly.
+
+    Resetting the original generator clears the buffer and rewinds all
+    clones to the start of the output stream, so that they produce the
+    same elements as regular clones would.
+
+    Spawning a shared-value clone creates an independent generator which
+    reads from a private copy of the original generator (and of the buffer).
+    This is reset together with the spawned clone, just like any regular
+    generator.
+    """
+
+    def __init__(self, g, *, owns_producer=False):
+        """
+        Parameters
+        ----------
+        g: TohuBaseGenerator
+            The generator whose elements this clone reads. If `g` is itself
+            a shared-value clone, the new clone reads from the same buffer
+            (starting at the same position as `g`).
+        owns_producer: bool
+            If True, `g` is a private copy which is only read by this clone
+            (see `spawn()`), so it is reset whenever this clone is reset.
+        """
+        super().__init__()
+        if isinstance(g, SharedValueClone):
+            self.buffer = g.buffer
+            self.position = g.position
+        else:
+            if g._shared_value_buffer is None:
+                g._shared_value_buffer = SharedValueBuffer(g)
+            self.buffer = g._shared_value_buffer
+            self.position = self.buffer.end
+        self.owns_producer = owns_producer
+        self.buffer.register_reader(self)
+
+    def __next__(self):
+        return self.buffer.next_value(self)
+
+    @property
+    def supports_batch(self):
+        return self.buffer.producer.supports_batch
+
+    def next_batch(self, num, *, exact=True):
+        return self.buffer.next_values(self, num, exact=exact)
+
+    @property
+    def max_value(self):
+        return self.buffer.producer.max_value
+
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        if self.owns_producer:
+            self.buffer.producer._set_exact_mode(exact)
+
+    def reset(self, seed):
+        """
+        Note that this does not rewind the clone, because it reads its elements
+        from a shared buffer which is only reset when the original generator is
+        reset (and this automatically resets its clones, too). The exception is
+        a spawned clone, which owns its private copy of the original generator.
+        """
+        super().reset(seed)
+        if self.owns_producer:
+            self.buffer.producer.reset(seed)
+        return self
+
+    def spawn(self, spawn_mapping=None):
+        # Reading from the same buffer would make the spawned generator produce
+        # the same elements as this one (rather than an independent copy, which
+        # is what e.g. `Tee` expects), so we read from a private copy instead.
+        new_obj = SharedValueClone(self.buffer.producer.spawn(spawn_mapping), owns_producer=True)
+        new_obj._set_random_state_from(self)
+        return new_obj
+
+    def _set_random_state_from(self, other):
+        super()._set_random_state_from(other)
+        if isinstance(other, SharedValueClone):
+            if other.buffer is not self.buffer:
+                if self.owns_producer:
+                    self.buffer.producer._set_random_state_from(other.buffer.producer)
+                self.buffer._set_state_from(other.buffer)
+            self.position = other.position
+        else:
+            # `other` is a regular clone, which is in sync with its parent
+            # as long as it hasn't been consumed separately, so we continue
+            # with the next element produced by our own original generator.
+            self.position = self.buffer.end
@@ -1,11 +1,24 @@
 from abc import ABCMeta
-from ..base import TohuBaseGenerator
+from collections import namedtuple
+from itertools import starmap
+from tqdm import tqdm
+
+from ...items_class_cache import get_items_class
+from ..base import TohuBaseGenerator, SharedValueClone, BATCH_PROGRESSBAR_CHUNK_SIZE
+from ..item_list import ColumnarItemList
 from ..tohu_namespace import TohuNamespace
-from .utils import make_tohu_items_class, get_tohu_items_name
+from ..utils import concatenate_columns
+from .utils import make_next_item_function, make_tohu_items_class, get_tohu_items_name
 
 __all__ = ['CustomGenerator']
 
 
+# Field generator templates and field names of a custom generator class (see
+# `CustomGenerator._set_field_generator_templates()`). `class_generators` is
+# used to check that the generators defined on the class haven't changed.
+FieldGeneratorBlueprint = namedtuple('FieldGeneratorBlueprint', ['class_generators', 'ns_gen_templates', 'field_names'])
+
+
 def augment_init_method(cls):
     """
     Replace the existing cls.__init__() method with a new one which
@@ -15,26 +28,32 @@ def augment_init_method(cls):
     orig_init = cls.__init__
 
     def new_init(self, *args, **kwargs):
+        if self.__dict__.get('_is_initialising', False):
+            # We are being called from the __init__() method of a subclass (either explicitly
+            # via super().__init__() or because the subclass doesn't define its own __init__).
+            # The bookkeeping below is done by the subclass's augmented __init__ method.
+            orig_init(self, *args, **kwargs)
+            return
+
         super(CustomGenerator, self).__init__()  # TODO: does this behave correctly with longer inheritance chains?
 
-        orig_init(self, *args, **kwargs)
+        base_attr_names = set(self.__dict__)
+        self._is_initialising = True
+        try:
+            orig_init(self, *args, **kwargs)
+        finally:
+            del self._is_initialising
 
+        # Remember the attributes set by the original __init__ method so that `spawn()` can copy them.
+        self._orig_init_attr_names = [
+            name for name, value in self.__dict__.items()
+            if name not in base_attr_names and not isinstance(value, TohuBaseGenerator)
+        ]
         self.orig_args = args
         self.orig_kwargs = kwargs
 
-        self.ns_gen_templates = TohuNamespace()
-        self.ns_gen_templates.update_from_dict(self.__class__.__dict__)
-        self.ns_gen_templates.update_from_dict(self.__dict__)
-        self.ns_gen_templates.set_owner(self.__class__)
-        self._mark_field_generator_templates()
-
-        self.ns_gens = self.ns_gen_templates.spawn()
-        self.ns_gens.set_owner(self)
-
-        self._update_namespace_with_field_generators()
-        self._set_field_names()
-        self._set_tohu_items_name()
-        self._set_tohu_items_cls()
+        self._set_field_generator_templates()
+        self._init_field_generators(self.ns_gen_templates)
 
     cls.__init__ = new_init
 
@@ -53,6 +72,69 @@ class CustomGeneratorMeta(ABCMeta):
 
 class CustomGenerator(TohuBaseGenerator, metaclass=CustomGeneratorMeta):
 
+    # If True, clones of the constituent generators (e.g. the inputs of derived
+    # generators) read the elements of the original generators from a shared
+    # buffer instead of re-computing them (see `SharedValueClone`). This avoids
+    # computing the same values several times per item when field generators
+    # depend on each other, e.g. in chains of `Lookup` or `Apply` generators.
+    __shared_clones__ = False
+
+    def _set_field_generator_templates(self):
+        """
+        Set the namespace containing the field generator templates (i.e. the
+        generators defined on the class and in the instance's __init__ method)
+        as well as the field names and the items class.
+
+        If __init__ doesn't define any generators, all of these only depend on
+        the class. In this case they are computed once and cached on the class
+        (as a `FieldGeneratorBlueprint`), so that creating further instances
+        only needs to spawn the templates.
+        """
+        cls = self.__class__
+        has_instance_generators = any(isinstance(x, TohuBaseGenerator) for x in self.__dict__.values())
+
+        # The blueprint is only valid as long as the generators defined on the class don't change.
+        # Note that generators must be compared by identity because `==` is overloaded for them.
+        class_generators = [(name, g) for name, g in cls.__dict__.items() if isinstance(g, TohuBaseGenerator)]
+        blueprint = cls.__dict__.get('_field_generator_blueprint')
+        if (
+            not has_instance_generators
+            and blueprint is not None
+            and len(blueprint.class_generators) == len(class_generators)
+            and all(n1 == n2 and g1 is g2 for (n1, g1), (n2, g2) in zip(blueprint.class_generators, class_generators))
+        ):
+            self.ns_gen_templates = blueprint.ns_gen_templates
+            self.field_names = blueprint.field_names
+            return
+
+        self.ns_gen_templates = TohuNamespace()
+        self.ns_gen_templates.update_from_dict(cls.__dict__)
+        self.ns_gen_templates.update_from_dict(self.__dict__)
+        self.ns_gen_templates.set_owner(cls)
+        self._mark_field_generator_templates()
+
+        self._set_field_names()
+        self._set_tohu_items_name()
+        self._set_tohu_items_cls()
+
+        if not has_instance_generators:
+            cls._field_generator_blueprint = FieldGeneratorBlueprint(class_generators, self.ns_gen_templates, self.field_names)
+
+    def _init_field_generators(self, ns_to_spawn):
+        """
+        Create this instance's field generators by spawning the generators in
+        `ns_to_spawn` (either the field generator templates or, when spawning,
+        the field generators of the original instance).
+        """
+        self.ns_gens = ns_to_spawn.spawn(shared_clones=self.__shared_clones__)
+        self.ns_gens.set_owner(self)
+
+        self._update_namespace_with_field_generators()
+        self._set_field_generators()
+        if self.__shared_clones__:
+            self._detach_unread_shared_clones()
+        self._set_next_item_function()
+
     def _mark_field_generator_templates(self):
         """
         Mark field generator templates as such so that an indication of this is
@@ -65,7 +147,7 @@ class CustomGenerator(TohuBaseGenerator, metaclass=CustomGeneratorMeta):
         self.__dict__.update(self.ns_gens.named_generators)
 
     def _set_field_names(self):
-        constituent_generator_names = list(self.ns_gens.names)
+        constituent_generator_names = list(self.ns_gen_templates.names)
 
         if not hasattr(self, '__fields__'):
             self.field_names = constituent_generator_names
@@ -77,25 +159,159 @@ class CustomGenerator(TohuBaseGenerator, metaclass=CustomGeneratorMeta):
                 if field_name not in constituent_generator_names:
                     raise ValueError(f"Attribute __fields__ contains name which is not a named field generator: '{field_name}'")
 
+    def _set_field_generators(self):
+        """
+        Set the generators which produce the field values. If a field generator
+        has shared-value clones its elements must be read through the shared
+        buffer, too, so in this case we use a shared-value clone instead.
+        """
+        self.field_gens = {}
+        for name in self.field_names:
+            g = self.ns_gens[name]
+            if g._shared_value_buffer is not None:
+                g = g.clone()
+            self.field_gens[name] = g
+
+    def _detach_unread_shared_clones(self):
+        """
+        Unregister shared-value clones which are not read when producing the
+        field values (e.g. inputs of generators which are not included in
+        `__fields__`). Otherwise their positions would never advance and the
+        shared buffers could never discard any elements.
+        """
+        reachable = set()
+        to_visit = list(self.field_gens.values())
+        while to_visit:
+            g = to_visit.pop()
+            if id(g) in reachable:
+                continue
+            reachable.add(id(g))
+            to_visit.extend(getattr(g, 'constituent_generators', []))
+            if isinstance(g, SharedValueClone):
+                to_visit.append(g.buffer.producer)
+
+        for g in self.ns_gens.all_generators:
+            buffer = g._shared_value_buffer
+            if buffer is not None:
+                for reader in list(buffer.readers):
+                    if id(reader) not in reachable:
+                        buffer.unregister_reader(reader)
+
     def _set_tohu_items_name(self):
         self.__class__.__tohu_items_name__ = get_tohu_items_name(self.__class__)
 
     def _set_tohu_items_cls(self):
         if not hasattr(self.__class__, 'tohu_items_cls'):
-            self.__class__.tohu_items_cls = make_tohu_items_class(self.__tohu_items_name__, self.field_names)
+            self.__class__.tohu_items_cls = get_items_class(
+                'tohu.v6', self.__tohu_items_name__, self.field_names, make_tohu_items_class
+            )
+
+    def _set_next_item_function(self):
+        # The attributes of tohu_items_cls are defined in the same order as
+        # self.field_names (and self.field_gens), so the specialised function
+        # can construct the items positionally.
+        self._next_item = make_next_item_function(self.tohu_items_cls, list(self.field_gens.values()))
 
     def __next__(self):
-        field_values = {name: next(self.ns_gens[name]) for name in self.field_names}
-        return self.tohu_items_cls(**field_values)
+        return self._next_item()
+
+    @property
+    def supports_batch(self):
+        return all(g.supports_batch for g in self.field_gens.values())
+
+    def next_batch(self, num, *, exact=True):
+        # The attributes of tohu_items_cls are defined in the same order as
+        # self.field_names, so we can construct the items positionally.
+        columns = self.next_batch_columns(num, exact=exact)
+        return list(starmap(self.tohu_items_cls, zip(*columns.values())))
+
+    def next_batch_columns(self, num, *, exact=True):
+        """
+        Return a dictionary mapping each field name to a sequence (list or
+        NumPy array) containing the next `num` values of this field.
+
+        This produces the same values as `next_batch()` but stores them
+        column-by-column instead of creating an item object for each row.
+        """
+        field_gens = list(self.field_gens.values())
+
+        if self.supports_batch:
+            columns = [g.next_batch(num, exact=exact) for g in field_gens]
+        else:
+            rows = [[next(g) for g in field_gens] for _ in range(num)]
+            columns = [list(col) for col in zip(*rows)] if num > 0 else [[] for _ in field_gens]
+
+        return dict(zip(self.field_names, columns))
+
+    def generate(self, num, *, seed=None, progressbar=False, exact=True, columnar=False):
+        """
+        Return sequence of `num` elements.
+
+        If `columnar` is True, the field values are stored column-by-column
+        and the returned item list only creates the actual items when they
+        are accessed. This is much faster and uses far less memory when
+        generating large numbers of items. See `TohuBaseGenerator.generate()`
+        for the remaining arguments.
+        """
+        if not columnar:
+            return super().generate(num, seed=seed, progressbar=progressbar, exact=exact)
+
+        self._set_exact_mode(exact)
+        if seed is not None:
+            self.reset(seed)
+
+        if progressbar:
+            chunks = []
+            with tqdm(total=num) as pbar:
+                for chunk_start in range(0, num, BATCH_PROGRESSBAR_CHUNK_SIZE):
+                    chunk_size = min(BATCH_PROGRESSBAR_CHUNK_SIZE, num - chunk_start)
+                    chunks.append(self.next_batch_columns(chunk_size, exact=exact))
+                    pbar.update(chunk_size)
+            columns = {name: concatenate_columns([c[name] for c in chunks]) for name in self.field_names}
+        else:
+            columns = self.next_batch_columns(num, exact=exact)
+
+        return ColumnarItemList(columns, num, tohu_items_cls=self.tohu_items_cls)
+
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        self.ns_gens.set_exact_mode(exact)
 
     def reset(self, seed):
         super().reset(seed)
         self.ns_gens.reset(seed)
         return self
 
+    @classmethod
+    def _spawn_from(cls, source):
+        """
+        Alternative constructor used by `spawn()`. Instead of running __init__
+        again, the new instance reuses the field generator templates of `source`
+        and copies the attributes set by its original __init__ method (note that
+        these are shared with `source`, not copied deeply). The field generators
+        are spawned from the ones of `source`, which also copies their state.
+        """
+        new_obj = cls.__new__(cls)
+        super(CustomGenerator, new_obj).__init__()
+        new_obj.__dict__.update({name: source.__dict__[name] for name in source._orig_init_attr_names})
+        new_obj._orig_init_attr_names = source._orig_init_attr_names
+        new_obj.orig_args = source.orig_args
+        new_obj.orig_kwargs = source.orig_kwargs
+        new_obj.ns_gen_templates = source.ns_gen_templates
+        new_obj.field_names = source.field_names
+        new_obj._init_field_generators(source.ns_gens)
+        return new_obj
+
     def spawn(self, spawn_mapping=None):
-        new_obj = self.__class__(*self.orig_args, **self.orig_kwargs)
-        new_obj._set_random_state_from(self)
+        new_obj = self.__class__._spawn_from(self)
+
+        if self.__shared_clones__:
+            # Some derived generators (e.g. Cumsum) consume elements of their inputs
+            # when they are created. With shared-value clones this advances the new
+            # original generators, so we need to copy their full state again.
+            new_obj._set_random_state_from(self)
+        else:
+            new_obj._set_own_random_state_from(self)
 
         # # Explicitly set tohu_items_cls. This is necessary because due to
         # # the way in which `attr` works, explicit comparisons between
@@ -107,5 +323,15 @@ class CustomGenerator(TohuBaseGenerator, metaclass=CustomGeneratorMeta):
         return new_obj
 
     def _set_random_state_from(self, other):
-        super()._set_random_state_from(other)
         self.ns_gens._set_random_state_from(other.ns_gens)
+        self._set_own_random_state_from(other)
+
+    def _set_own_random_state_from(self, other):
+        """
+        Copy the state of this generator (but not of the generators in its namespace) from `other`.
+        """
+        super()._set_random_state_from(other)
+        for name, g in self.field_gens.items():
+            if g is not self.ns_gens[name]:
+                # Shared-value clone created in _set_field_generators()
+                g._set_random_state_from(other.field_gens[name])
@@ -2,10 +2,12 @@ import attr
 import pandas as pd
 import re
 
+from functools import lru_cache
+
 from ..base import TohuBaseGenerator
 from ..logging import logger
 
-__all__ = ['get_tohu_items_name', 'make_tohu_items_class']
+__all__ = ['get_tohu_items_name', 'make_next_item_function', 'make_tohu_items_class']
 
 
 def make_tohu_items_class(clsname, attr_names):
@@ -17,9 +19,15 @@ def make_tohu_items_class(clsname, attr_names):
 
     attr_names: list of strings
         Names of the attributes of the class to be created
+
+    The class uses `__slots__` (without a slot for weak references) rather than
+    a per-instance `__dict__`, which substantially reduces the memory needed by
+    each item. This matters for item lists with many millions of items.
     """
 
-    item_cls = attr.make_class(clsname, {name: attr.ib() for name in attr_names}, repr=False, cmp=True, frozen=True)
+    item_cls = attr.make_class(
+        clsname, {name: attr.ib() for name in attr_names}, repr=False, cmp=True, frozen=True, slots=True, weakref_slot=False
+    )
 
     def new_repr(self):
         all_fields = ', '.join([f'{name}={repr(value)}' for name, value in attr.asdict(self).items()])
@@ -89,4 +97,37 @@ def get_tohu_items_name(cls):
             )
             raise ValueError(msg)
 
-    return tohu_items_name
\ No newline at end of file
+    return tohu_items_name
+
+
+@lru_cache(maxsize=None)
+def _compile_next_item_factory(num_fields):
+    """
+    Return a factory function which creates a specialised function for
+    producing the next item from `num_fields` field generators. The source
+    code is generated (similarly to how `attr` creates `__init__` methods)
+    so that the field generators are held in closure variables and the
+    item is constructed positionally, without any per-item loops or dicts.
+    """
+    gen_names = [f'g{i}' for i in range(num_fields)]
+    src = (
+        f"def make_next_item(items_cls, next, {', '.join(gen_names)}):\n"
+        f"    def next_item():\n"
+        f"        return items_cls({', '.join(f'next({name})' for name in gen_names)})\n"
+        f"    return next_item\n"
+    )
+    namespace = {}
+    exec(compile(src, f"<tohu next_item ({num_fields} fields)>", "exec"), namespace)
+    return namespace['make_next_item']
+
+
+def make_next_item_function(items_cls, field_gens):
+    """
+    Return a function without arguments which produces the next item
+    by calling `next()` on each of the given field generators and
+    passing the resulting values to `items_cls` (positionally, so the
+    generators must be in the same order as the attributes of the
+    items class).
+    """
+    make_next_item = _compile_next_item_factory(len(field_gens))
+    return make_next_item(items_cls, next, *field_gens)
@@ -1,9 +1,15 @@
 import datetime as dt
+import numpy as np
+import pandas as pd
 
+from bisect import bisect
+from collections.abc import Sequence
+from itertools import accumulate, chain, repeat
+from math import floor, isfinite
 from operator import attrgetter
 from random import Random
 
-from .base import TohuBaseGenerator, SeedGenerator
+from .base import TohuBaseGenerator, SeedGenerator, InexactValueStream, as_integer_seed
 from .logging import logger
 from .primitive_generators import as_tohu_generator, Constant, Date, Timestamp as TimestampPrimitive
 from .spawn_mapping import SpawnMapping
@@ -11,6 +17,14 @@ from .utils import TohuDateError, TohuTimestampError, ensure_is_date_object, mak
 
 __all__ = ['Apply', 'Cumsum', 'GetAttribute', 'Integer', 'Lookup', 'MultiCumsum', 'SelectMultiple', 'SelectOne', 'Tee', 'Timestamp']
 
+# Maximum number of random keys drawn at once by SelectMultiple when sampling
+# many elements from a small pool (see `SelectMultiple._sample_indices_inexact`).
+SELECT_MULTIPLE_RANDOM_KEYS_CHUNK_SIZE = 1_000_000
+
+# Maximum size of the dense array used by Lookup to find the positions of
+# integer keys (i.e., maximum difference between the largest and smallest key).
+LOOKUP_DENSE_ARRAY_MAX_SIZE = 100_000
+
 
 class DerivedGenerator(TohuBaseGenerator):
     """
@@ -59,6 +73,31 @@ class Apply(DerivedGenerator):
         kwargs = {name: next(g) for name, g in self.kwarg_gens.items()}
         return self.callable(*args, **kwargs)
 
+    @property
+    def supports_batch(self):
+        # Subclasses which customise `__next__` (but not `next_batch`) must be
+        # consumed item by item, because `next_batch` calls the callable directly.
+        cls = type(self)
+        if cls.__next__ is not Apply.__next__ and cls.next_batch is Apply.next_batch:
+            return False
+        return all(g.supports_batch for g in self.constituent_generators)
+
+    def next_batch(self, num, *, exact=True):
+        # Each constituent generator produces its own independent stream of
+        # values, so we can produce them column-by-column and only apply the
+        # callable row-by-row (which preserves the order in which any random
+        # state inside the callable is advanced).
+        arg_batches = [g.next_batch(num, exact=exact) for g in self.arg_gens]
+        kwarg_names = list(self.kwarg_gens.keys())
+        kwarg_batches = [g.next_batch(num, exact=exact) for g in self.kwarg_gens.values()]
+
+        arg_rows = zip(*arg_batches) if arg_batches else repeat((), num)
+        if kwarg_batches == []:
+            return [self.callable(*args) for args in arg_rows]
+        else:
+            kwarg_rows = zip(*kwarg_batches)
+            return [self.callable(*args, **dict(zip(kwarg_names, kwargs))) for args, kwargs in zip(arg_rows, kwarg_rows)]
+
     def reset(self, seed):
         super().reset(seed)
 
@@ -125,6 +164,13 @@ class GetAttribute(Apply):
 class Lookup(Apply):
     """
     Generator which performs a lookup of elements produced by another generator.
+
+    If the mapping is a constant dictionary, batches of keys are looked up in a
+    single vectorised step using a pandas Index of the dictionary keys (or a dense
+    array of positions if all keys are integers within a small range). This index
+    is rebuilt whenever the keys of the dictionary change. Other mappings (e.g. a
+    `defaultdict` or `Counter`, which may define custom lookup behaviour for missing
+    keys) are looked up key by key.
     """
 
     def __init__(self, key, mapping):
@@ -136,6 +182,92 @@ class Lookup(Apply):
 
         super().__init__(f_lookup, self.key, self.mapping)
 
+        self._init_constant_mapping()
+
+    def _init_constant_mapping(self):
+        """
+        Pre-compute the data structures used to look up batches of keys if the mapping
+        is a constant dictionary. Otherwise `self._mapping_values` is set to None.
+        """
+        self._mapping_values = None
+        # Only plain dictionaries are supported because subclasses (and other mappings)
+        # may customise the lookup, e.g. return default values for missing keys.
+        if not (isinstance(self.mapping, Constant) and type(self.mapping.value) is dict):
+            return
+
+        keys = list(self.mapping.value.keys())
+        key_index = pd.Index(keys, dtype=object)
+        if len(keys) == 0 or not key_index.is_unique:
+            return
+
+        self._mapping_values = list(self.mapping.value.values())
+        self._mapping_keys = keys
+        self._key_index = key_index
+
+        self._dense_positions = None
+        if all(type(k) is int for k in keys):
+            min_key, max_key = min(keys), max(keys)
+            if max_key - min_key < LOOKUP_DENSE_ARRAY_MAX_SIZE:
+                self._dense_positions = np.full(max_key - min_key + 1, -1, dtype=np.intp)
+                self._dense_positions[np.array(keys) - min_key] = np.arange(len(keys))
+                self._dense_min_key = min_key
+
+    def _update_constant_mapping(self):
+        """
+        Make sure that the pre-computed data structures reflect the current contents
+        of the mapping, in case the dictionary was modified after this generator
+        was created. This is cheap compared to looking up a batch of keys.
+        """
+        mapping = self.mapping.value
+        if list(mapping.keys()) != self._mapping_keys:
+            self._init_constant_mapping()
+        else:
+            self._mapping_values = list(mapping.values())
+
+    def lookup_positions(self, keys):
+        """
+        Return a NumPy array with the positions of the given keys in the (constant) mapping.
+        Raises a KeyError if any of the keys is not contained in the mapping.
+        """
+        keys_array = np.asarray(keys) if not isinstance(keys, list) else None
+        if self._dense_positions is not None and keys_array is not None and keys_array.dtype.kind in 'iu':
+            idx = keys_array.astype(np.int64) - self._dense_min_key
+            is_in_range = (idx >= 0) & (idx < len(self._dense_positions))
+            positions = np.full(len(idx), -1, dtype=np.intp)
+            positions[is_in_range] = self._dense_positions[idx[is_in_range]]
+        else:
+            positions = self._key_index.get_indexer(pd.Index(list(keys), dtype=object))
+
+        is_missing = positions < 0
+        if is_missing.any():
+            raise KeyError(list(keys)[np.argmax(is_missing)])
+        return positions
+
+    def next_batch_positions(self, num, *, exact=True):
+        """
+        Return a NumPy array with the positions of the next `num` looked-up values
+        in the (constant) mapping. This is only supported if the mapping is a constant
+        dictionary.
+
+        See `next_batch()` for the meaning of the `exact` argument.
+        """
+        if self._mapping_values is None:
+            raise TypeError("Looking up positions is only supported if the mapping is a constant dictionary.")
+
+        self._update_constant_mapping()
+        keys = self.arg_gens[0].next_batch(num, exact=exact)
+        # Advance the (constant) mapping generator as well to keep all constituent generators in sync.
+        self.arg_gens[1].next_batch(num, exact=exact)
+        return self.lookup_positions(keys)
+
+    def next_batch(self, num, *, exact=True):
+        if self._mapping_values is None:
+            return super().next_batch(num, exact=exact)
+
+        positions = self.next_batch_positions(num, exact=exact)
+        values = self._mapping_values
+        return [values[pos] for pos in positions.tolist()]
+
     def spawn(self, spawn_mapping=None):
         spawn_mapping = spawn_mapping or SpawnMapping()
         new_obj = Lookup(spawn_mapping[self.key], spawn_mapping[self.mapping])
@@ -154,7 +286,7 @@ class Integer(Apply):
 
     def reset(self, seed):
         super().reset(seed)
-        self.randgen.seed(next(self.seed_generator))
+        self.randgen.seed(as_integer_seed(next(self.seed_generator)))
         return self
 
     def spawn(self, spawn_mapping=None):
@@ -171,21 +303,104 @@ class Integer(Apply):
 class SelectOne(Apply):
     """
     Generator which selects a single element from each sequence produced by another generator.
+
+    If both `values` and `p` are constant, the cumulative weights are computed only once
+    and each element is selected by binary search (rather than calling `random.choices()`,
+    which re-computes the cumulative weights every time). This produces the same elements.
     """
 
     def __init__(self, values, p=None):
         self.values_gen = as_tohu_generator(values)
         self.p_gen = as_tohu_generator(p)
         self.randgen = Random()
+        self.np_randgen = np.random.default_rng()
+        self.inexact_random_numbers = InexactValueStream(self._draw_inexact_random_numbers)
 
         def func(values, p):
             return self.randgen.choices(values, weights=p)[0]
 
         super().__init__(func, self.values_gen, self.p_gen)
 
+        self._init_constant_sampler()
+
+    def _init_constant_sampler(self):
+        """
+        Pre-compute the cumulative weights used to select elements if `values` and `p` are
+        constant. This mirrors the implementation of `random.choices()` so that the selected
+        elements are the same. If `values` and `p` are not constant (or invalid, in which
+        case `random.choices()` raises an error) then `self._constant_values` is set to None.
+        """
+        self._constant_values = None
+        if not (isinstance(self.values_gen, Constant) and isinstance(self.p_gen, Constant)):
+            return
+
+        values, weights = self.values_gen.value, self.p_gen.value
+        if weights is None:
+            if len(values) > 0:
+                self._constant_values, self._cum_weights = values, None
+        else:
+            try:
+                cum_weights = list(accumulate(weights))
+            except TypeError:
+                return
+            total = cum_weights[-1] + 0.0 if cum_weights else 0.0
+            if len(cum_weights) == len(values) and total > 0.0 and isfinite(total):
+                self._constant_values, self._cum_weights, self._total = values, cum_weights, total
+                self._cum_weights_array = np.array(cum_weights, dtype=float)
+
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        # If `values` or `p` are not constant then inexact batches fall back to __next__.
+        self.exact_mode = exact or self._constant_values is None
+        self.inexact_random_numbers.clear()
+
+    def _draw_inexact_random_numbers(self, num):
+        return self.np_randgen.random(num)
+
+    def __next__(self):
+        if self._constant_values is None:
+            return super().__next__()
+
+        values = self._constant_values
+        r = self.randgen.random() if self.exact_mode else float(self.inexact_random_numbers.next_value())
+        if self._cum_weights is None:
+            return values[floor(r * len(values))]
+        else:
+            return values[bisect(self._cum_weights, r * self._total, 0, len(values) - 1)]
+
+    def next_batch_indices(self, num, *, exact=True):
+        """
+        Return a NumPy array with the indices of the next `num` selected elements.
+        This is only supported if `values` and `p` are constant.
+
+        See `next_batch()` for the meaning of the `exact` argument.
+        """
+        if self._constant_values is None:
+            raise TypeError("Selecting indices is only supported if both `values` and `p` are constant.")
+
+        if exact and self.exact_mode:
+            r = np.array([self.randgen.random() for _ in range(num)])
+        else:
+            r = self.inexact_random_numbers.next_values(num)
+
+        if self._cum_weights is None:
+            return np.floor(r * len(self._constant_values)).astype(np.intp)
+        else:
+            indices = self._cum_weights_array.searchsorted(r * self._total, side='right')
+            return np.minimum(indices, len(self._constant_values) - 1)
+
+    def next_batch(self, num, *, exact=True):
+        if self._constant_values is None:
+            return super().next_batch(num, exact=exact)
+
+        values = self._constant_values
+        return [values[idx] for idx in self.next_batch_indices(num, exact=exact).tolist()]
+
     def reset(self, seed):
         super().reset(seed)
-        self.randgen.seed(seed)
+        self.randgen.seed(as_integer_seed(seed))
+        self.np_randgen = np.random.default_rng(seed)
+        self.inexact_random_numbers.clear()
         return self
 
     def spawn(self, spawn_mapping=None):
@@ -197,6 +412,9 @@ class SelectOne(Apply):
     def _set_random_state_from(self, other):
         super()._set_random_state_from(other)
         self.randgen.setstate(other.randgen.getstate())
+        self.np_randgen.bit_generator.state = other.np_randgen.bit_generator.state
+        self.exact_mode = other.exact_mode
+        self.inexact_random_numbers._set_state_from(other.inexact_random_numbers)
 
     def _spot_check_that_elements_produced_by_this_generator_have_attribute(self, name):
         """
@@ -219,18 +437,144 @@ class SelectMultiple(Apply):
     """
     Generator which selects multiple elements (without replacement)
     from each sequence produced by another generator.
+
+    If `values` is a constant sequence, batches can also be produced as a ragged
+    array of indices into `values` (see `next_batch_indices()`).
     """
 
     def __init__(self, values, num):
         self.values_gen = as_tohu_generator(values)
         self.num_gen = as_tohu_generator(num)
         self.randgen = Random()
+        self.np_randgen = np.random.default_rng()
         func = self.randgen.sample
         super().__init__(func, self.values_gen, k=self.num_gen)
 
+    def next_batch_indices(self, num, *, exact=True):
+        """
+        Return the next `num` selections as a ragged array of indices into `values`.
+        This is only supported if `values` is a constant sequence.
+
+        The result is a tuple `(indices, offsets)` of NumPy arrays, where the indices
+        of the elements selected in the i-th row are `indices[offsets[i]:offsets[i+1]]`.
+
+        See `next_batch()` for the meaning of the `exact` argument.
+        """
+        if not self._has_constant_sequence_values():
+            raise TypeError("Selecting indices is only supported if `values` is a constant sequence.")
+
+        # Advance the (constant) values generator as well to keep all constituent generators in sync.
+        self.arg_gens[0].next_batch(num, exact=exact)
+        ks = np.asarray(self.kwarg_gens['k'].next_batch(num, exact=exact), dtype=np.intp)
+        n = len(self.values_gen.value)
+
+        offsets = np.zeros(num + 1, dtype=np.intp)
+        np.cumsum(ks, out=offsets[1:])
+
+        if exact:
+            # `random.sample()` selects the same positions regardless of the elements
+            # in the population, so sampling from `range(n)` yields their indices.
+            rows = [self.randgen.sample(range(n), k) for k in ks.tolist()]
+            indices = np.fromiter(chain.from_iterable(rows), dtype=np.intp, count=offsets[-1])
+        else:
+            if num > 0 and (ks.min() < 0 or ks.max() > n):
+                raise ValueError("Sample larger than population or is negative")
+            indices = self._sample_indices_inexact(ks, n)
+
+        return indices, offsets
+
+    def _has_constant_sequence_values(self):
+        # `random.sample()` only accepts sequences (e.g. it raises a TypeError for
+        # NumPy arrays), so for other values we must not sample indices instead.
+        return isinstance(self.values_gen, Constant) and isinstance(self.values_gen.value, Sequence)
+
+    def _sample_indices_inexact(self, ks, n):
+        """
+        Return the concatenated indices of random samples (without replacement)
+        of sizes `ks` from the range 0..n-1.
+        """
+        num = len(ks)
+        k_max = int(ks.max()) if num > 0 else 0
+        if k_max == 0:
+            return np.empty(0, dtype=np.intp)
+
+        is_selected = np.arange(k_max) < ks[:, np.newaxis]
+
+        if k_max * k_max <= n:
+            # Draw indices with replacement and re-draw any rows which contain
+            # duplicates (which only happens for a small fraction of rows).
+            indices = self.np_randgen.integers(0, n, size=(num, k_max))
+            rows_to_check = np.arange(num)
+            while len(rows_to_check) > 0:
+                # Replace unselected entries with distinct negative values so that they never count as duplicates.
+                rows = np.where(is_selected[rows_to_check], indices[rows_to_check], -1 - np.arange(k_max))
+                rows.sort(axis=1)
+                rows_to_check = rows_to_check[(rows[:, 1:] == rows[:, :-1]).any(axis=1)]
+                indices[rows_to_check] = self.np_randgen.integers(0, n, size=(len(rows_to_check), k_max))
+        else:
+            # Assign random keys to all elements; the elements with the `k` smallest
+            # keys (in the order of their keys) form a random sample of size `k`.
+            indices = np.empty((num, k_max), dtype=np.intp)
+            chunk_size = max(1, SELECT_MULTIPLE_RANDOM_KEYS_CHUNK_SIZE // n)
+            for start in range(0, num, chunk_size):
+                keys = self.np_randgen.random((min(chunk_size, num - start), n))
+                smallest = np.argpartition(keys, k_max - 1, axis=1)[:, :k_max]
+                order = np.take_along_axis(keys, smallest, axis=1).argsort(axis=1)
+                indices[start:start + len(keys)] = np.take_along_axis(smallest, order, axis=1)
+
+        return indices[is_selected]
+
+    def next_batch(self, num, *, exact=True):
+        if not exact and self._has_lookup_with_constant_sequence_pools():
+            return self._next_batch_from_lookup_inexact(num)
+
+        if not self._has_constant_sequence_values():
+            return super().next_batch(num, exact=exact)
+
+        values = self.values_gen.value
+        indices, offsets = self.next_batch_indices(num, exact=exact)
+        selected_values = [values[idx] for idx in indices.tolist()]
+        return [selected_values[start:end] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+    def _has_lookup_with_constant_sequence_pools(self):
+        lookup = self.arg_gens[0]
+        if not isinstance(lookup, Lookup) or lookup._mapping_values is None:
+            return False
+        lookup._update_constant_mapping()
+        return lookup._mapping_values is not None and all(isinstance(pool, Sequence) for pool in lookup._mapping_values)
+
+    def _next_batch_from_lookup_inexact(self, num):
+        """
+        Helper method for the case that the values are produced by a Lookup with a
+        constant mapping, so that each row selects elements from one of a fixed set
+        of pools (the mapping values). The rows are grouped by pool and the samples
+        for each group are drawn in one go.
+        """
+        pool_positions = self.arg_gens[0].next_batch_positions(num, exact=False)
+        pools = self.arg_gens[0]._mapping_values
+        ks = np.asarray(self.kwarg_gens['k'].next_batch(num, exact=False), dtype=np.intp)
+
+        items = [None] * num
+        order = pool_positions.argsort(kind='stable')
+        group_sizes = np.bincount(pool_positions, minlength=len(pools))
+        group_ends = np.cumsum(group_sizes)
+        for pos in np.flatnonzero(group_sizes).tolist():
+            rows = order[group_ends[pos] - group_sizes[pos]:group_ends[pos]]
+            pool = pools[pos]
+            ks_group = ks[rows]
+            if ks_group.min() < 0 or ks_group.max() > len(pool):
+                raise ValueError("Sample larger than population or is negative")
+            selected_values = [pool[idx] for idx in self._sample_indices_inexact(ks_group, len(pool)).tolist()]
+            start = 0
+            for row, k in zip(rows.tolist(), ks_group.tolist()):
+                items[row] = selected_values[start:start + k]
+                start += k
+        return items
+
     def reset(self, seed):
         super().reset(seed)
-        self.randgen.seed(seed)
+        self.randgen.seed(as_integer_seed(seed))
+        self.np_randgen = np.random.default_rng(seed)
         return self
 
     def spawn(self, spawn_mapping=None):
@@ -242,6 +586,7 @@ class SelectMultiple(Apply):
     def _set_random_state_from(self, other):
         super()._set_random_state_from(other)
         self.randgen.setstate(other.randgen.getstate())
+        self.np_randgen.bit_generator.state = other.np_randgen.bit_generator.state
 
     def size(self):
         def get_size(x):
@@ -269,6 +614,11 @@ class Tee(Apply):
 
         super().__init__(make_tuple, self.num_gen, *self.value_gens)
 
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        for g in self.value_gens:
+            g._set_exact_mode(exact)
+
     def reset(self, seed):
         super().reset(seed)
 
@@ -422,9 +772,12 @@ class Timestamp(Apply):
         ts = super().__next__()
         return self._maybe_format_timestamp(ts)
 
+    def next_batch(self, num, *, exact=True):
+        return [self._maybe_format_timestamp(ts) for ts in super().next_batch(num, exact=exact)]
+
     def reset(self, seed):
         super().reset(seed)
-        self.offset_randgen.seed(next(self.seed_generator))
+        self.offset_randgen.seed(as_integer_seed(next(self.seed_generator)))
         return self
 
     def spawn(self, spawn_mapping=None):
@@ -461,6 +814,17 @@ class Cumsum(DerivedGenerator):
         self.value += next(self.g_internal)
         return retval
 
+    @property
+    def supports_batch(self):
+        return self.g_internal.supports_batch
+
+    def next_batch(self, num, *, exact=True):
+        retvals = []
+        for x in self.g_internal.next_batch(num, exact=exact):
+            retvals.append(self.value)
+            self.value += x
+        return retvals
+
     def reset(self, seed=None):
         super().reset(seed)
 
@@ -522,6 +886,24 @@ class MultiCumsum(DerivedGenerator):
         self.cur_values[x] += next(self.g_amount_internal)
         return cur_val
 
+    @property
+    def supports_batch(self):
+        return self.g_internal.supports_batch and self.g_amount_internal.supports_batch
+
+    def next_batch(self, num, *, exact=True):
+        xs = self.g_internal.next_batch(num, exact=exact)
+        amounts = self.g_amount_internal.next_batch(num, exact=exact)
+
+        retvals = []
+        for x, amount in zip(xs, amounts):
+            try:
+                cur_val = self.cur_values[x]
+            except KeyError:
+                cur_val = getattr(x, self.attr_name)
+            self.cur_values[x] = cur_val + amount
+            retvals.append(cur_val)
+        return retvals
+
     def reset(self, seed=None):
         super().reset(seed)
         self.cur_values = {}
@@ -0,0 +1,129 @@
+"""
+This module implements an on-disk cache for the preprocessed geometry used
+by `GeoJSONGeolocation`. Parsing large GeoJSON files and converting their
+features to shapely geometries (and triangulating them) can take a long time,
+so the result is stored in a compact binary `.npz` file which is much faster
+to load. The cache files are keyed by a hash of the GeoJSON file contents
+(and the options which affect the preprocessed data), so that they are
+automatically ignored if the GeoJSON file changes.
+
+The following arrays are stored in each cache file:
+
+- `wkb_buffer`, `wkb_offsets`: concatenated WKB representations of the feature
+  geometries and the offsets of each feature's WKB in the buffer
+- `properties`: JSON representation of the selected attributes of each feature
+- `triangles`, `triangle_cum_areas`, `triangle_offsets` (only if the features
+  were triangulated): concatenated triangle vertices and cumulative areas of all
+  features, and the offsets of each feature's triangles in these arrays
+"""
+
+import hashlib
+import json
+import numpy as np
+import os
+import shapely
+import tempfile
+
+from .logging import logger
+
+__all__ = ['get_cache_filename', 'load_preprocessed_features', 'save_preprocessed_features']
+
+CACHE_FORMAT_VERSION = 1
+
+
+def hash_file_contents(filename, *, chunk_size=2**20):
+    """
+    Return the SHA-256 hex digest of the contents of the given file.
+    """
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get_cache_filename(cache_dir, geojson_filename, *, include_attributes, sampling):
+    """
+    Return the path of the cache file for the given GeoJSON file and options.
+    """
+    h = hashlib.sha256()
+    h.update(hash_file_contents(geojson_filename).encode())
+    h.update(json.dumps([CACHE_FORMAT_VERSION, list(include_attributes), sampling]).encode())
+    return os.path.join(cache_dir, f"geojson_{h.hexdigest()[:32]}.npz")
+
+
+def _concatenate_with_offsets(arrays, empty_shape):
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(a) for a in arrays])
+    values = np.concatenate(arrays) if len(arrays) > 0 else np.empty(empty_shape)
+    return values, offsets
+
+
+def _split_at_offsets(values, offsets):
+    return [values[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def save_preprocessed_features(cache_filename, shapes, properties, *, triangles=None, triangle_cum_areas=None):
+    """
+    Save preprocessed features to the given cache file.
+
+    Parameters
+    ----------
+    cache_filename: str
+        Path of the cache file.
+    shapes: list of shapely geometries
+        Geometry of each feature.
+    properties: list of dict
+        Selected attributes of each feature.
+    triangles, triangle_cum_areas: list of NumPy arrays or None
+        Triangulation of each feature (see `ShapelyGeolocation`).
+    """
+    wkbs = shapely.to_wkb(shapes)
+    wkb_buffer, wkb_offsets = _concatenate_with_offsets(
+        [np.frombuffer(wkb, dtype=np.uint8) for wkb in wkbs], empty_shape=(0,)
+    )
+    arrays = {
+        'wkb_buffer': wkb_buffer.astype(np.uint8),
+        'wkb_offsets': wkb_offsets,
+        'properties': np.array(json.dumps(properties)),
+    }
+    if triangles is not None:
+        arrays['triangles'], arrays['triangle_offsets'] = _concatenate_with_offsets(triangles, empty_shape=(0, 3, 2))
+        arrays['triangle_cum_areas'], _ = _concatenate_with_offsets(triangle_cum_areas, empty_shape=(0,))
+
+    # Write to a temporary file first so that concurrent processes never see a partially written cache file.
+    cache_dir = os.path.dirname(cache_filename) or '.'
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_filename = tempfile.mkstemp(dir=cache_dir, suffix='.npz.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.chmod(tmp_filename, 0o644)  # mkstemp() creates files which are only readable by the owner
+        os.replace(tmp_filename, cache_filename)
+    except BaseException:
+        os.remove(tmp_filename)
+        raise
+    logger.debug(f"Saved preprocessed GeoJSON features to cache file: '{cache_filename}'")
+
+
+def load_preprocessed_features(cache_filename):
+    """
+    Load preprocessed features from the given cache file.
+
+    Returns a tuple `(shapes, properties, triangles, triangle_cum_areas)`, where
+    the last two elements are None if the cache file contains no triangulation.
+    """
+    with np.load(cache_filename) as data:
+        wkb_buffer = data['wkb_buffer'].tobytes()
+        wkbs = [wkb_buffer[start:end] for start, end in zip(data['wkb_offsets'][:-1], data['wkb_offsets'][1:])]
+        shapes = list(shapely.from_wkb(wkbs))
+        properties = json.loads(str(data['properties']))
+
+        if 'triangles' in data:
+            triangles = _split_at_offsets(data['triangles'], data['triangle_offsets'])
+            triangle_cum_areas = _split_at_offsets(data['triangle_cum_areas'], data['triangle_offsets'])
+        else:
+            triangles, triangle_cum_areas = None, None
+
+    logger.debug(f"Loaded preprocessed GeoJSON features from cache file: '{cache_filename}'")
+    return shapes, properties, triangles, triangle_cum_areas
@@ -1,3 +1,4 @@
+import attr
 import gzip
 import io
 import logging
@@ -9,10 +10,13 @@ from operator import attrgetter
 from sqlalchemy import create_engine, inspect
 from sqlalchemy.schema import CreateSchema
 
+from .lazy_sequences import RepeatedValue, to_numpy_column
 from .utils import explode_columns
 
 logger = logging.getLogger('tohu')
 
+CSV_EXPORT_CHUNK_SIZE = 100_000
+
 
 def _generate_csv_header_line(*, header_names, header_prefix='', header=True, sep=',', newline='\n'):
     """
@@ -254,22 +258,19 @@ class ItemList:
             raise TypeError(f"Invalid output file: {output_file} (type: {type(output_file)})")
 
         retval = None
-        attr_getters = [attrgetter(attr_name) for attr_name in fields.values()]
         try:
             # TODO: quick-and-dirty solution to enable writing to gzip files; tidy this up!
             # (Note that for regular file output we don't want to encode each line to a bytes
             # object because this seems to be ca. 2x slower).
             if isinstance(file_or_string, gzip.GzipFile):
                 file_or_string.write(header_line.encode())
-                for x in self.items:
-                    line = sep.join([format(func(x)) for func in attr_getters]) + newline
-                    file_or_string.write(line.encode())
+                for lines in self._iter_csv_lines(fields, sep=sep, newline=newline):
+                    file_or_string.write(lines.encode())
 
             else:
                 file_or_string.write(header_line)
-                for x in self.items:
-                    line = sep.join([format(func(x)) for func in attr_getters]) + newline
-                    file_or_string.write(line)
+                for lines in self._iter_csv_lines(fields, sep=sep, newline=newline):
+                    file_or_string.write(lines)
 
             if output_file is None:
                 retval = file_or_string.getvalue()
@@ -279,6 +280,15 @@ class ItemList:
 
         return retval
 
+    def _iter_csv_lines(self, fields, *, sep, newline):
+        """
+        Helper method which yields the CSV output for the items in this list
+        (one or more lines at a time, each terminated by `newline`).
+        """
+        attr_getters = [attrgetter(attr_name) for attr_name in fields.values()]
+        for x in self.items:
+            yield sep.join([format(func(x)) for func in attr_getters]) + newline
+
     def to_sql(self, url, table_name, *, schema=None, fields=None, fields_to_explode=None, if_exists="fail", dtype=None):
         """
         Export items as rows in a PostgreSQL table.
@@ -343,3 +353,201 @@ class ItemList:
         with engine.begin() as conn:
             self.to_df(fields=fields, fields_to_explode=fields_to_explode).to_sql(
                 table_name, conn, schema=schema, index=False, if_exists=if_exists, dtype=dtype)
+
+
+class ColumnarItemList(ItemList):
+    """
+    Item list which stores the values of each field in a separate column
+    (one sequence per field) and only creates the actual item objects
+    when they are accessed.
+    """
+
+    def __init__(self, columns, num, *, tohu_items_cls):
+        """
+        Parameters
+        ----------
+        columns: dict
+            Dictionary mapping field names to sequences of field values.
+            The order of the fields must match the order of the attributes
+            of `tohu_items_cls`.
+        num: integer
+            Number of items (i.e., length of each column).
+        tohu_items_cls: class
+            Class used to create items from the field values.
+        """
+        self.columns = columns
+        self.num = num
+        self.tohu_items_cls = tohu_items_cls
+        self.randstate = np.random.RandomState()
+
+    @property
+    def field_names(self):
+        return list(self.columns.keys())
+
+    @property
+    def items(self):
+        return list(self)
+
+    def _make_item(self, idx):
+        return self.tohu_items_cls(*(col[idx] for col in self.columns.values()))
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._make_item(i) for i in range(*idx.indices(self.num))]
+        else:
+            return self._make_item(idx)
+
+    def __iter__(self):
+        return (self.tohu_items_cls(*field_values) for field_values in zip(*self.columns.values()))
+
+    def _get_column(self, attr_name, *, explode=False):
+        """
+        Return the column of values corresponding to `attr_name`. This is either
+        the name of a field or a dotted name such as 'field_name.attr' which refers
+        to an attribute of the items stored in a field. If `explode` is True, the
+        field values are expected to be sequences and the attribute is extracted
+        from each element of these sequences.
+        """
+        try:
+            return self.columns[attr_name]
+        except KeyError:
+            pass
+
+        field_name, _, attr_name_rest = attr_name.partition('.')
+        if field_name not in self.columns or attr_name_rest == '':
+            raise AttributeError(f"Items in this list have no attribute '{attr_name}'")
+
+        func = attrgetter(attr_name_rest)
+        if explode:
+            return [[func(x) for x in value] for value in self.columns[field_name]]
+        else:
+            return [func(value) for value in self.columns[field_name]]
+
+    def _take(self, indices):
+        """
+        Return a new ColumnarItemList containing the items at the given indices.
+        """
+        columns = {name: take_from_column(col, indices) for name, col in self.columns.items()}
+        return ColumnarItemList(columns, len(indices), tohu_items_cls=self.tohu_items_cls)
+
+    def subsample(self, *, num=None, p=None, seed=None):
+        """
+        Return a random subsample of the items in this list. The same items
+        are selected as by `ItemList.subsample()` for the same seed, but the
+        result is always a ColumnarItemList (whereas `ItemList.subsample()`
+        returns a NumPy array of items if `p` is given).
+        """
+        self.reset(seed)
+
+        if num is None and p is None:
+            raise ValueError("Exactly one of the arguments `num`, `p` must be given.")
+
+        if num is not None:
+            if num > self.num:
+                raise ValueError(f"Subsample cannot be larger than the original sample of size {self.num}")
+            # Note: this draws the same indices as ItemList.subsample() does for the same seed.
+            indices = self.randstate.choice(self.num, size=num, replace=False)
+        elif p is not None:
+            if p < 0 or p > 1.0:
+                raise ValueError(f"The value of p must be in the range [0, 1]. Got: p={p}")
+            indices = np.flatnonzero(self.randstate.random_sample(self.num) < p)
+        else:
+            raise ValueError("Arguments `num` and `p` are mutually exclusive - only one of them may be specified.")
+
+        return self._take(indices)
+
+    def to_df(self, fields=None, fields_to_explode=None):
+        """
+        Export items as rows in a pandas dataframe table. The columns
+        are passed to pandas directly without creating any items.
+        See `ItemList.to_df()` for a description of the arguments.
+        """
+        if isinstance(fields, (list, tuple)):
+            fields = {name: name for name in fields}
+
+        assert fields_to_explode is None or isinstance(fields_to_explode, (list, tuple))
+        if fields_to_explode is None:
+            fields_to_explode = []
+
+        convert_field_values = fields is None
+        if fields is None:
+            fields = {name: name for name in self.field_names}
+
+        if not set(fields_to_explode).issubset(fields.keys()):
+            raise ValueError(
+                "All fields to explode must occur as column names. "
+                f"Got field names: {fields_to_explode}. Column names: {list(fields.keys())}"
+            )
+
+        try:
+            columns = {
+                colname: self._get_column(attr_name, explode=(colname in fields_to_explode))
+                for colname, attr_name in fields.items()
+            }
+        except AttributeError as exc:
+            msg = (
+                "Could not export to dataframe. Did you forget to pass any fields "
+                "which contain sequences within the 'fields_to_explode' argument?. "
+                f"The original error message was: \"{exc}\""
+            )
+            raise AttributeError(msg)
+
+        if convert_field_values:
+            # Mimic ItemList.to_df(), which converts each item using attr.astuple()
+            columns = {colname: astuple_column(col) for colname, col in columns.items()}
+
+        columns = {colname: to_numpy_column(col) for colname, col in columns.items()}
+        df = pd.DataFrame(columns, columns=list(fields.keys()))
+
+        if fields_to_explode != []:
+            df = explode_columns(df, fields_to_explode)
+
+        return df
+
+    def _iter_csv_lines(self, fields, *, sep, newline):
+        columns = [self._get_column(attr_name) for attr_name in fields.values()]
+        for chunk_start in range(0, self.num, CSV_EXPORT_CHUNK_SIZE):
+            chunk_end = chunk_start + CSV_EXPORT_CHUNK_SIZE
+            formatted_columns = [map(format, col[chunk_start:chunk_end]) for col in columns]
+            yield ''.join([sep.join(values) + newline for values in zip(*formatted_columns)])
+
+
+def take_from_column(col, indices):
+    """
+    Return the elements of the column `col` (a list or NumPy array) at the given indices.
+    """
+    if isinstance(col, np.ndarray):
+        return col[indices]
+    else:
+        return [col[idx] for idx in indices]
+
+
+def astuple_value(value):
+    """
+    Convert a single field value in the same way as `attr.astuple()`
+    converts the attribute values of an item (with its default settings).
+    """
+    if attr.has(value.__class__):
+        return attr.astuple(value)
+    elif isinstance(value, (tuple, list, set, frozenset)):
+        return [attr.astuple(x) if attr.has(x.__class__) else x for x in value]
+    elif isinstance(value, dict):
+        return {
+            (attr.astuple(k) if attr.has(k.__class__) else k): (attr.astuple(v) if attr.has(v.__class__) else v)
+            for k, v in value.items()
+        }
+    else:
+        return value
+
+
+def astuple_column(col):
+    """
+    Apply `astuple_value()` to all elements of the column `col`. Numeric NumPy
+    arrays and lazy sequences of primitive values are returned unchanged.
+    """
+    if isinstance(col, RepeatedValue):
+        return RepeatedValue(astuple_value(col.value), col.num)
+    elif isinstance(col, list) or (isinstance(col, np.ndarray) and col.dtype == object):
+        return [astuple_value(value) for value in col]
+    else:
+        return col
@@ -0,0 +1,141 @@
+"""
+This module contains compact sequence types which are returned by the
+`next_batch()` method of some primitive generators. They represent a
+batch of items without storing each item individually, and items are
+only created when they are accessed.
+
+Columnar exports convert these sequences into NumPy arrays directly
+(see `to_numpy_column()`), which is much faster than iterating over them.
+"""
+
+import numpy as np
+
+from collections.abc import Sequence
+from itertools import repeat
+from operator import index
+
+__all__ = ['LazySequence', 'PrefixedCounter', 'RepeatedValue', 'to_numpy_column']
+
+
+class LazySequence(Sequence):
+    """
+    Base class for sequences which compute their elements on access.
+    Subclasses must implement `__len__`, `_get_item`, `_get_slice`
+    and `to_numpy`.
+    """
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self._get_slice(*idx.indices(len(self)))
+
+        idx = index(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"{self.__class__.__name__} index out of range")
+        return self._get_item(idx)
+
+    def __eq__(self, other):
+        if isinstance(other, (Sequence, np.ndarray)):
+            return len(self) == len(other) and all(x == y for x, y in zip(self, other))
+        else:
+            return NotImplemented
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.to_numpy()
+        return arr if dtype is None else arr.astype(dtype)
+
+
+class RepeatedValue(LazySequence):
+    """
+    Sequence containing the same value `num` times.
+    """
+
+    def __init__(self, value, num):
+        self.value = value
+        self.num = num
+
+    def __repr__(self):
+        return f"<RepeatedValue: {self.value!r} (x{self.num})>"
+
+    def __len__(self):
+        return self.num
+
+    def __iter__(self):
+        return repeat(self.value, self.num)
+
+    def _get_item(self, idx):
+        return self.value
+
+    def _get_slice(self, start, stop, step):
+        return RepeatedValue(self.value, len(range(start, stop, step)))
+
+    def to_numpy(self):
+        if isinstance(self.value, (bool, int, float, str)):
+            return np.full(self.num, self.value)
+        else:
+            # Use an object array so that NumPy doesn't try to broadcast
+            # sequence values (such as lists or tuples) across the array.
+            arr = np.empty(self.num, dtype=object)
+            arr.fill(self.value)
+            return arr
+
+
+class PrefixedCounter(LazySequence):
+    """
+    Sequence of strings of the form "PREFIX001", "PREFIX002", ... which
+    consist of a fixed prefix followed by a zero-padded counter value.
+    """
+
+    def __init__(self, prefix, digits, start, num):
+        """
+        Parameters
+        ----------
+        prefix: string
+            Prefix of each element.
+        digits: integer
+            Number of digits of the (zero-padded) counter.
+        start: integer
+            Counter value of the first element.
+        num: integer
+            Number of elements.
+        """
+        self.prefix = prefix
+        self.digits = digits
+        self.start = start
+        self.num = num
+        self.fmt_str = self.prefix + '{{:0{digits}}}'.format(digits=digits)
+
+    def __repr__(self):
+        return f"<PrefixedCounter: {self.fmt_str.format(self.start)!r}, ... (x{self.num})>"
+
+    def __len__(self):
+        return self.num
+
+    def __iter__(self):
+        return map(self.fmt_str.format, range(self.start, self.start + self.num))
+
+    def _get_item(self, idx):
+        return self.fmt_str.format(self.start + idx)
+
+    def _get_slice(self, start, stop, step):
+        if step != 1:
+            return [self._get_item(idx) for idx in range(start, stop, step)]
+        return PrefixedCounter(self.prefix, self.digits, self.start + start, max(stop - start, 0))
+
+    def to_numpy(self):
+        counter_values = np.arange(self.start, self.start + self.num).astype(str)
+        return np.char.add(self.prefix, np.char.zfill(counter_values, self.digits))
+
+
+def to_numpy_column(col):
+    """
+    Convert lazy sequences (including `range` objects) to NumPy arrays.
+    Any other column is returned unchanged.
+    """
+    if isinstance(col, range):
+        return np.arange(col.start, col.stop, col.step)
+    elif isinstance(col, LazySequence):
+        return col.to_numpy()
+    else:
+        return col
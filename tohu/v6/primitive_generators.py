@@ -1,16 +1,24 @@
 import attr
+import binascii
 import datetime as dt
 import geojson
+import inspect
 import numpy as np
+import os
 import shapely
 
 from faker import Faker
+from functools import partial
 from random import Random
-from shapely.geometry import Point, Polygon, MultiPolygon
+from shapely.geometry import Polygon, MultiPolygon
 
-from .base import TohuBaseGenerator, PrimitiveGenerator, SeedGenerator
+from ..items_class_cache import get_items_class
+from .base import TohuBaseGenerator, PrimitiveGenerator, SeedGenerator, InexactValueStream, as_integer_seed
+from .geojson_cache import get_cache_filename, load_preprocessed_features, save_preprocessed_features
+from .lazy_sequences import PrefixedCounter, RepeatedValue
 from .logging import logger
-from .utils import ensure_is_date_object, ensure_is_datetime_object, identity, make_timestamp_formatter, TohuDateError, TohuTimestampError
+from .utils import ensure_is_date_object, ensure_is_datetime_object, identity, TimestampFormatter, \
+    TohuDateError, TohuTimestampError
 
 __all__ = ['Boolean', 'CharString', 'Constant', 'Date', 'DigitString', 'FakerGenerator', 'Float', 'GeoJSONGeolocation',
            'HashDigest', 'Incremental', 'Integer', 'NumpyRandomGenerator', 'Sequential', 'Timestamp', 'as_tohu_generator']
@@ -21,6 +29,8 @@ class Constant(PrimitiveGenerator):
     Generator which produces a constant sequence (repeating the same value indefinitely).
     """
 
+    supports_shared_clones = False
+
     def __init__(self, value):
         """
         Parameters
@@ -54,6 +64,9 @@ class Constant(PrimitiveGenerator):
     def __next__(self):
         return self.value
 
+    def next_batch(self, num, *, exact=True):
+        return RepeatedValue(self.value, num)
+
     def spawn(self, spawn_mapping=None):
         return Constant(self.value)
 
@@ -76,15 +89,36 @@ class Boolean(PrimitiveGenerator):
         super().__init__()
         self.p = p
         self.randgen = Random()
+        self.np_randgen = np.random.default_rng()
+        self.inexact_values = InexactValueStream(self._draw_inexact)
 
     def reset(self, seed):
         super().reset(seed)
-        self.randgen.seed(seed)
+        self.randgen.seed(as_integer_seed(seed))
+        self.np_randgen = np.random.default_rng(seed)
+        self.inexact_values.clear()
         return self
 
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        self.exact_mode = exact
+        self.inexact_values.clear()
+
+    def _draw_inexact(self, num):
+        return self.np_randgen.random(num) < self.p
+
     def __next__(self):
+        if not self.exact_mode:
+            return bool(self.inexact_values.next_value())
         return self.randgen.random() < self.p
 
+    def next_batch(self, num, *, exact=True):
+        if exact and self.exact_mode:
+            random = self.randgen.random
+            return [random() < self.p for _ in range(num)]
+        else:
+            return self.inexact_values.next_values(num)
+
     def spawn(self, spawn_mapping=None):
         new_obj = Boolean(self.p)
         new_obj._set_random_state_from(self)
@@ -92,6 +126,9 @@ class Boolean(PrimitiveGenerator):
 
     def _set_random_state_from(self, other):
         self.randgen.setstate(other.randgen.getstate())
+        self.np_randgen.bit_generator.state = other.np_randgen.bit_generator.state
+        self.exact_mode = other.exact_mode
+        self.inexact_values._set_state_from(other.inexact_values)
 
 
 class Incremental(PrimitiveGenerator):
@@ -124,6 +161,19 @@ class Incremental(PrimitiveGenerator):
         self.cur_value += self.step
         return retval
 
+    def next_batch(self, num, *, exact=True):
+        if not (type(self.cur_value) is int and type(self.step) is int):
+            # Non-integer values are accumulated step by step (as in __next__)
+            # to ensure the result is affected by rounding in the same way.
+            return super().next_batch(num, exact=exact)
+
+        if self.step == 0:
+            retval = RepeatedValue(self.cur_value, num)
+        else:
+            retval = range(self.cur_value, self.cur_value + num * self.step, self.step)
+        self.cur_value += num * self.step
+        return retval
+
     def reset(self, seed=None):
         super().reset(seed)
         self.cur_value = self.start
@@ -158,6 +208,8 @@ class Integer(PrimitiveGenerator):
         self.low = low
         self.high = high
         self.randgen = Random()
+        self.np_randgen = np.random.default_rng()
+        self.inexact_values = InexactValueStream(self._draw_inexact)
 
     @property
     def max_value(self):
@@ -165,12 +217,32 @@ class Integer(PrimitiveGenerator):
 
     def reset(self, seed):
         super().reset(seed)
-        self.randgen.seed(next(self.seed_generator))
+        seed_internal = next(self.seed_generator)
+        self.randgen.seed(as_integer_seed(seed_internal))
+        self.np_randgen = np.random.default_rng(seed_internal)
+        self.inexact_values.clear()
         return self
 
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        self.exact_mode = exact
+        self.inexact_values.clear()
+
+    def _draw_inexact(self, num):
+        return self.np_randgen.integers(self.low, self.high, size=num, endpoint=True)
+
     def __next__(self):
+        if not self.exact_mode:
+            return int(self.inexact_values.next_value())
         return self.randgen.randint(self.low, self.high)
 
+    def next_batch(self, num, *, exact=True):
+        if exact and self.exact_mode:
+            randint = self.randgen.randint
+            return [randint(self.low, self.high) for _ in range(num)]
+        else:
+            return self.inexact_values.next_values(num)
+
     def spawn(self, spawn_mapping=None):
         new_obj = Integer(self.low, self.high)
         new_obj._set_random_state_from(self)
@@ -179,6 +251,9 @@ class Integer(PrimitiveGenerator):
     def _set_random_state_from(self, other):
         super()._set_random_state_from(other)
         self.randgen.setstate(other.randgen.getstate())
+        self.np_randgen.bit_generator.state = other.np_randgen.bit_generator.state
+        self.exact_mode = other.exact_mode
+        self.inexact_values._set_state_from(other.inexact_values)
 
 
 class Float(PrimitiveGenerator):
@@ -199,15 +274,36 @@ class Float(PrimitiveGenerator):
         self.low = low
         self.high = high
         self.randgen = Random()
+        self.np_randgen = np.random.default_rng()
+        self.inexact_values = InexactValueStream(self._draw_inexact)
 
     def reset(self, seed):
         super().reset(seed)
-        self.randgen.seed(seed)
+        self.randgen.seed(as_integer_seed(seed))
+        self.np_randgen = np.random.default_rng(seed)
+        self.inexact_values.clear()
         return self
 
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        self.exact_mode = exact
+        self.inexact_values.clear()
+
+    def _draw_inexact(self, num):
+        return self.np_randgen.uniform(self.low, self.high, size=num)
+
     def __next__(self):
+        if not self.exact_mode:
+            return float(self.inexact_values.next_value())
         return self.randgen.uniform(self.low, self.high)
 
+    def next_batch(self, num, *, exact=True):
+        if exact and self.exact_mode:
+            uniform = self.randgen.uniform
+            return [uniform(self.low, self.high) for _ in range(num)]
+        else:
+            return self.inexact_values.next_values(num)
+
     def spawn(self, spawn_mapping=None):
         new_obj = Float(self.low, self.high)
         new_obj._set_random_state_from(self)
@@ -215,6 +311,9 @@ class Float(PrimitiveGenerator):
 
     def _set_random_state_from(self, other):
         self.randgen.setstate(other.randgen.getstate())
+        self.np_randgen.bit_generator.state = other.np_randgen.bit_generator.state
+        self.exact_mode = other.exact_mode
+        self.inexact_values._set_state_from(other.inexact_values)
 
 
 
@@ -228,6 +327,10 @@ CHARACTER_SETS = {
 }
 
 
+# Maximum length of digit strings which can be represented as int64 values in DigitString.next_batch()
+DIGIT_STRING_MAX_INTEGER_LENGTH = 18
+
+
 class CharString(PrimitiveGenerator):
     """
     Generator which produces a sequence of character strings.
@@ -253,6 +356,19 @@ class CharString(PrimitiveGenerator):
             self.charset = charset
         self.seed_generator = SeedGenerator()
         self.char_gen = Random()
+        self.np_randgen = np.random.default_rng()
+        self.inexact_values = InexactValueStream(self._draw_inexact)
+        self._charset_codes = self._get_charset_codes()
+
+    def _get_charset_codes(self):
+        """
+        Return array with the unicode code points of the characters in the
+        character set (or None if it contains anything other than single
+        characters, in which case the vectorised batch path cannot be used).
+        """
+        if not all(isinstance(c, str) and len(c) == 1 for c in self.charset):
+            return None
+        return np.array([ord(c) for c in self.charset], dtype=np.uint32)
 
     def spawn(self, spawn_mapping=None):
         new_obj = CharString(length=self.length, charset=self.charset)
@@ -262,14 +378,41 @@ class CharString(PrimitiveGenerator):
     def _set_random_state_from(self, other):
         self.seed_generator._set_random_state_from(other.seed_generator)
         self.char_gen.setstate(other.char_gen.getstate())
+        self.np_randgen.bit_generator.state = other.np_randgen.bit_generator.state
+        self.exact_mode = other.exact_mode
+        self.inexact_values._set_state_from(other.inexact_values)
+
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        # Character sets which can't be vectorised use the same stream in inexact batches.
+        self.exact_mode = exact or self._charset_codes is None or self.length == 0
+        self.inexact_values.clear()
+
+    def _draw_inexact(self, num):
+        # Draw a (num x length) matrix of indices into the character set, map
+        # them to unicode code points and view each row as a fixed-width string.
+        indices = self.np_randgen.integers(0, len(self._charset_codes), size=(num, self.length))
+        return self._charset_codes[indices].view(f'U{self.length}').reshape(num)
 
     def __next__(self):
+        if not self.exact_mode:
+            return str(self.inexact_values.next_value())
         chars = self.char_gen.choices(self.charset, k=self.length)
         return ''.join(chars)
 
+    def next_batch(self, num, *, exact=True):
+        if (exact and self.exact_mode) or self._charset_codes is None or self.length == 0:
+            choices = self.char_gen.choices
+            return [''.join(choices(self.charset, k=self.length)) for _ in range(num)]
+        else:
+            return self.inexact_values.next_values(num)
+
     def reset(self, seed):
         super().reset(seed)
-        self.char_gen.seed(next(self.seed_generator))
+        seed_internal = next(self.seed_generator)
+        self.char_gen.seed(as_integer_seed(seed_internal))
+        self.np_randgen = np.random.default_rng(seed_internal)
+        self.inexact_values.clear()
         return self
 
 
@@ -293,6 +436,19 @@ class DigitString(CharString):
         new_obj._set_random_state_from(self)
         return new_obj
 
+    def _draw_inexact(self, num):
+        if not (0 < self.length <= DIGIT_STRING_MAX_INTEGER_LENGTH):
+            return super()._draw_inexact(num)
+
+        # Draw random integers with at most `length` digits and format them as
+        # zero-padded strings by extracting their digits one position at a time.
+        values = self.np_randgen.integers(0, 10**self.length, size=num, dtype=np.int64)
+        codes = np.empty((num, self.length), dtype=np.uint32)
+        for pos in range(self.length - 1, -1, -1):
+            values, codes[:, pos] = np.divmod(values, 10)
+        codes += ord('0')
+        return codes.view(f'U{self.length}').reshape(num)
+
 
 class HashDigest(PrimitiveGenerator):
     """
@@ -315,7 +471,7 @@ class HashDigest(PrimitiveGenerator):
         """
         super().__init__()
         self.length = length
-        self._internal_length = length if as_bytes else length / 2
+        self._internal_length = length if as_bytes else length // 2
         if not as_bytes and (length % 2) != 0:
             raise ValueError(
                 f"Length must be an even number if as_bytes=False because it "
@@ -323,18 +479,57 @@ class HashDigest(PrimitiveGenerator):
         self.as_bytes = as_bytes
         self.uppercase = uppercase
         self.randgen = np.random.RandomState()
+        self.inexact_values = InexactValueStream(self._draw_inexact)
         self._maybe_convert_to_hex = identity if self.as_bytes else bytes.hex
         self._maybe_convert_to_uppercase = identity if (self.as_bytes or not uppercase) else str.upper
 
     def reset(self, seed):
         super().reset(seed)
-        self.randgen.seed(seed)
+        self.randgen.seed(as_integer_seed(seed))
+        self.inexact_values.clear()
         return self
 
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        self.exact_mode = exact
+        self.inexact_values.clear()
+
+    def _draw_inexact(self, num):
+        buf = self.randgen.bytes(num * self._internal_length)
+        return np.frombuffer(buf, dtype=np.uint8).reshape(num, self._internal_length)
+
     def __next__(self):
-        val = self.randgen.bytes(self._internal_length)
+        if not self.exact_mode:
+            val = self.inexact_values.next_value().tobytes()
+        else:
+            val = self.randgen.bytes(self._internal_length)
         return self._maybe_convert_to_uppercase(self._maybe_convert_to_hex(val))
 
+    def next_batch(self, num, *, exact=True):
+        # RandomState.bytes() draws random 32-bit integers and discards any unused bytes,
+        # so requesting all bytes in a single call only produces the same bytes as the
+        # per-item calls in __next__ if the internal length is a multiple of 4.
+        k = self._internal_length
+        if not self.exact_mode:
+            buf = self.inexact_values.next_values(num).tobytes()
+        elif exact and k % 4 != 0:
+            return super().next_batch(num, exact=exact)
+        else:
+            buf = self.randgen.bytes(num * k)
+
+        if self.as_bytes:
+            return [buf[i:i + k] for i in range(0, num * k, k)]
+
+        hex_buf = binascii.hexlify(buf)
+        if self.uppercase:
+            hex_buf = hex_buf.upper()
+
+        if exact:
+            hex_str = hex_buf.decode('ascii')
+            return [hex_str[i:i + self.length] for i in range(0, num * self.length, self.length)]
+        else:
+            return np.frombuffer(hex_buf, dtype=f'S{self.length}').astype(f'U{self.length}')
+
     def spawn(self, spawn_mapping=None):
         new_obj = HashDigest(length=self.length, as_bytes=self.as_bytes, uppercase=self.uppercase)
         new_obj._set_random_state_from(self)
@@ -343,6 +538,8 @@ class HashDigest(PrimitiveGenerator):
     def _set_random_state_from(self, other):
         super()._set_random_state_from(other)
         self.randgen.set_state(other.randgen.get_state())
+        self.exact_mode = other.exact_mode
+        self.inexact_values._set_state_from(other.inexact_values)
 
 
 class Sequential(PrimitiveGenerator):
@@ -406,6 +603,11 @@ class Sequential(PrimitiveGenerator):
         self.cnt += 1
         return self.fmt_str.format(self.cnt)
 
+    def next_batch(self, num, *, exact=True):
+        retval = PrefixedCounter(self.prefix, self.digits, start=self.cnt + 1, num=num)
+        self.cnt += num
+        return retval
+
 
 class NumpyRandomGenerator(TohuBaseGenerator):
     """
@@ -414,12 +616,19 @@ class NumpyRandomGenerator(TohuBaseGenerator):
     [1] https://docs.scipy.org/doc/numpy/reference/routines.random.html
     """
 
-    def __init__(self, method, **numpy_args):
+    def __init__(self, method, *, block_size=None, **numpy_args):
         """
         Parameters
         ----------
         method: string
             Name of the numpy function to use (see [1] for details)
+        block_size: integer or None
+            If given, draw values in blocks of this size (by passing `size=block_size`
+            to the numpy function) and return items from the current block until it
+            is used up. This produces the same items but avoids numpy's per-call
+            overhead, which dominates when drawing values one at a time. This is
+            only possible for methods which accept a `size` argument (and if
+            `size` is not already contained in `numpy_args`).
         numpy_args:
             Remaining arguments passed to the numpy function (see [1] for details)
 
@@ -429,25 +638,110 @@ class NumpyRandomGenerator(TohuBaseGenerator):
         """
         super().__init__()
         self.method = method
+        self.block_size = block_size
         self.random_state = np.random.RandomState()
         self.randgen = getattr(self.random_state, method)
         self.numpy_args = numpy_args
+        self.supports_batch = self._can_draw_multiple_values()
+        self._returns_python_scalars = self.supports_batch and self._check_returns_python_scalars()
+        self._clear_buffer()
+
+        if block_size is not None and not self.supports_batch:
+            raise ValueError(
+                f"Cannot draw values in blocks for numpy method '{method}' with arguments {numpy_args}. "
+                "This requires a method which accepts a 'size' argument (and 'size' must not be given explicitly)."
+            )
+
+    def _can_draw_multiple_values(self):
+        """
+        Return True if a single call of the numpy function with `size=num` produces
+        the same values as `num` individual calls (so that they can be drawn in
+        blocks or batches).
+        """
+        try:
+            parameters = inspect.signature(self.randgen).parameters
+        except ValueError:
+            return False
+
+        if 'size' not in parameters or 'size' in self.numpy_args:
+            return False
+
+        # Choosing multiple values without replacement in a single call
+        # is not the same as choosing them one by one.
+        if self.method == 'choice' and not self.numpy_args.get('replace', True):
+            return False
+
+        return True
+
+    def _check_returns_python_scalars(self):
+        """
+        Return True if individual calls of the numpy function return Python scalars
+        (e.g. `normal()` returns a `float`) rather than numpy scalars (e.g. `choice()`
+        returns a `numpy.int64` if choosing from a list of integers) or arrays.
+        This draws a sample value from a separate random state.
+        """
+        try:
+            value = getattr(np.random.RandomState(0), self.method)(**self.numpy_args)
+        except Exception:
+            # Invalid arguments; the actual calls will raise an error, too.
+            return False
+        return not isinstance(value, (np.generic, np.ndarray))
+
+    def _clear_buffer(self):
+        self._buffer = []
+        self._buffer_pos = 0
+
+    def _draw(self, num):
+        """
+        Draw `num` values using a single call to the numpy function and return them
+        as a list whose elements have the same types as the values returned by
+        individual calls (i.e., Python scalars or numpy arrays for multivariate
+        distributions).
+        """
+        values = self.randgen(size=num, **self.numpy_args)
+        return values.tolist() if self._returns_python_scalars else list(values)
 
     def reset(self, seed):
         super().reset(seed)
-        self.random_state.seed(seed)
+        self.random_state.seed(as_integer_seed(seed))
+        self._clear_buffer()
         return self
 
     def __next__(self):
-        return self.randgen(**self.numpy_args)
+        if self.block_size is None:
+            return self.randgen(**self.numpy_args)
+
+        if self._buffer_pos == len(self._buffer):
+            self._buffer = self._draw(self.block_size)
+            self._buffer_pos = 0
+
+        value = self._buffer[self._buffer_pos]
+        self._buffer_pos += 1
+        return value
+
+    def next_batch(self, num, *, exact=True):
+        if not self.supports_batch:
+            return super().next_batch(num, exact=exact)
+
+        # Serve any values left over in the current block first, then draw the rest
+        # in one go (numpy's legacy RandomState produces the same values for a call
+        # with `size=num` as for `num` individual calls).
+        values = self._buffer[self._buffer_pos:self._buffer_pos + num]
+        self._buffer_pos += len(values)
+        if len(values) < num:
+            values += self._draw(num - len(values))
+        return values
 
     def spawn(self, spawn_mapping=None):
-        new_obj = NumpyRandomGenerator(method=self.method, **self.numpy_args)
+        new_obj = NumpyRandomGenerator(method=self.method, block_size=self.block_size, **self.numpy_args)
         new_obj._set_random_state_from(self)
         return new_obj
 
     def _set_random_state_from(self, other):
         self.random_state.set_state(other.random_state.get_state())
+        # The buffer is never modified in place, so it can safely be shared.
+        self._buffer = other._buffer
+        self._buffer_pos = other._buffer_pos
 
 
 class FakerGenerator(PrimitiveGenerator):
@@ -483,7 +777,7 @@ class FakerGenerator(PrimitiveGenerator):
 
     def reset(self, seed):
         super().reset(seed)
-        self.fake.seed_instance(seed)
+        self.fake.seed_instance(as_integer_seed(seed))
         return self
 
     def __next__(self):
@@ -499,102 +793,403 @@ class FakerGenerator(PrimitiveGenerator):
         self.fake.random.setstate(other.fake.random.getstate())
 
 
+def make_geolocation_class(clsname, field_names):
+    """
+    Create the item class for geolocations. Items compare equal
+    if their `lon` and `lat` attributes are equal.
+    """
+    cls = attr.make_class(clsname, field_names, slots=True, weakref_slot=False)
+    cls.as_dict = lambda self: attr.asdict(self)
+    def __new_eq__(self, other):
+        return self.lon == other.lon and self.lat == other.lat
+    cls.__eq__ = __new_eq__
+    return cls
+
+
 class ShapelyGeolocation(PrimitiveGenerator):
     """
     Generator which produces random locations inside a shapely polygon
     or multipolygon. This is a helper class and most users will probably
     find the GeoJSONGeolocation generator more useful.
+
+    Locations are found by rejection sampling: candidate points are drawn
+    uniformly from the bounding box of the shape until one of them lies
+    inside the shape. The candidates are drawn in blocks and tested against
+    the (prepared) shape in one go using `shapely.contains_xy`. Candidates
+    which are not used up are kept for subsequent calls, so that the result
+    is the same as testing one candidate at a time.
+
+    Alternatively (with `sampling="triangulation"`), the shape is split into
+    triangles once and each location is produced by picking a triangle with
+    probability proportional to its area and then a uniformly random point
+    inside it. This never rejects a point, which makes it much faster for thin
+    or concave shapes whose bounding box is mostly empty.
     """
 
-    def __init__(self, shp, properties=None, max_tries=100):
+    SAMPLING_MODES = ("rejection", "triangulation")
+
+    # Attributes which are never modified after initialisation. They are
+    # shared with spawned generators (and clones) instead of recomputing them.
+    SHARED_ATTRIBUTES = (
+        "shape", "properties", "geolocation_cls", "max_tries", "sampling",
+        "acceptance_ratio", "triangles", "triangle_cum_areas",
+    )
+
+    def __init__(self, shp, properties=None, max_tries=100, sampling="rejection"):
         if not isinstance(shp, (Polygon, MultiPolygon)):
             raise TypeError(f"Argument 'shp' must be of type Polygon or MultiPolygon. Got: {type(shp)}")
+        if sampling not in self.SAMPLING_MODES:
+            raise ValueError(f"Argument 'sampling' must be one of {self.SAMPLING_MODES}. Got: '{sampling}'")
 
         super().__init__()
+        self._init_geometry(shapely.geometry.shape(shp), properties, max_tries=max_tries, sampling=sampling)
+        self._init_random_generators()
+
+    @classmethod
+    def _from_preprocessed(cls, shp, properties, *, max_tries, sampling, triangulation=None):
+        """
+        Create a new instance from a shape which is used as is (rather than copied),
+        optionally re-using a pre-computed triangulation (see `_triangulate()`).
+        """
+        new_obj = cls.__new__(cls)
+        PrimitiveGenerator.__init__(new_obj)
+        new_obj._init_geometry(shp, properties, max_tries=max_tries, sampling=sampling, triangulation=triangulation)
+        new_obj._init_random_generators()
+        return new_obj
 
-        self.shape = shapely.geometry.shape(shp)
+    def _init_geometry(self, shp, properties, *, max_tries, sampling, triangulation=None):
+        self.shape = shp
+        shapely.prepare(self.shape)
         self.properties = properties or dict()
 
         self.geolocation_cls = self._make_geolocation_class()
+        self.max_tries = max_tries
+        self.sampling = sampling
 
+        lon_min, lat_min, lon_max, lat_max = self.shape.bounds
+        bbox_area = (lon_max - lon_min) * (lat_max - lat_min)
+        self.acceptance_ratio = self.area / bbox_area if bbox_area > 0 else 1.0
+
+        if sampling == "triangulation":
+            self.triangles, self.triangle_cum_areas = triangulation or self._triangulate()
+        else:
+            self.triangles, self.triangle_cum_areas = None, None
+
+    def _init_random_generators(self):
         lon_min, lat_min, lon_max, lat_max = self.shape.bounds
         self.lon_gen = Float(lon_min, lon_max)
         self.lat_gen = Float(lat_min, lat_max)
-        self.max_tries = max_tries
         self.seed_generator = SeedGenerator()
+        self.triangle_randgen = np.random.default_rng()
+        self._clear_candidates()
 
     def _make_geolocation_class(self):
-        fields = {'lon': attr.ib(), 'lat': attr.ib()}
-        fields.update({name: attr.ib(value) for name, value in self.properties.items()})
-        cls = attr.make_class('Geolocation', fields)
-        cls.as_dict = lambda self: attr.asdict(self)
-        def __new_eq__(self, other):
-            return self.lon == other.lon and self.lat == other.lat
-        cls.__eq__ = __new_eq__
-        return cls
+        """
+        Return a callable which creates geolocation items from `lon` and `lat`
+        (with the shape's properties as additional attributes). The item class
+        only depends on the property names, so it is shared between all shapes
+        with the same properties (e.g. all features of a GeoJSON file).
+        """
+        cls = get_items_class('tohu.v6.geolocation', 'Geolocation', ['lon', 'lat', *self.properties], make_geolocation_class)
+        return partial(cls, **self.properties) if self.properties else cls
+
+    def _triangulate(self):
+        """
+        Split the shape into triangles. Returns an array of shape (num_triangles, 3, 2)
+        with the triangle vertices and the cumulative (normalised) triangle areas.
+        """
+        try:
+            # This is only available in shapely >= 2.1 (which requires Python >= 3.10),
+            # so we import it here rather than requiring this version for all of tohu.
+            from shapely import constrained_delaunay_triangles
+        except ImportError:
+            raise ImportError(
+                f"Geolocation sampling mode 'triangulation' requires shapely >= 2.1 (installed: {shapely.__version__}). "
+                "Please upgrade shapely or use sampling='rejection'."
+            )
+
+        triangles = constrained_delaunay_triangles(self.shape)
+        # Each triangle is a closed ring of four points, the last of which repeats the first.
+        vertices = shapely.get_coordinates(triangles).reshape(-1, 4, 2)[:, :3]
+        cum_areas = np.cumsum(shapely.area(shapely.get_parts(triangles)))
+        return vertices, cum_areas / cum_areas[-1]
 
     def __repr__(self):
         return f"<ShapelyShape, area={self.area:.3f}>"
 
     def spawn(self, spawn_mapping=None):
-        new_obj = ShapelyGeolocation(self.shape, properties=self.properties, max_tries=self.max_tries)
+        new_obj = self._make_spawn_sharing_geometry()
         new_obj._set_random_state_from(self)
         return new_obj
 
+    def _make_spawn_sharing_geometry(self):
+        """
+        Return a new instance of this class which shares the (immutable) shape,
+        geolocation class and triangulation with this generator but has its own
+        random generators (which are not yet initialised from this one).
+        """
+        new_obj = ShapelyGeolocation.__new__(ShapelyGeolocation)
+        PrimitiveGenerator.__init__(new_obj)
+        for name in self.SHARED_ATTRIBUTES:
+            setattr(new_obj, name, getattr(self, name))
+        new_obj._init_random_generators()
+        return new_obj
+
     def _set_random_state_from(self, other):
         self.seed_generator._set_random_state_from(other.seed_generator)
         self.lon_gen._set_random_state_from(other.lon_gen)
         self.lat_gen._set_random_state_from(other.lat_gen)
+        # The candidate arrays are never modified in place, so they can safely be shared.
+        self._candidate_lons = other._candidate_lons
+        self._candidate_lats = other._candidate_lats
+        self._candidate_hits = other._candidate_hits
+        self._candidate_pos = other._candidate_pos
+        self._num_misses = other._num_misses
+        self.triangle_randgen.bit_generator.state = other.triangle_randgen.bit_generator.state
 
     @property
     def area(self):
         return self.shape.area
 
-    def __next__(self):
-        for cnt in range(1, self.max_tries + 1):
-            pt = Point(next(self.lon_gen), next(self.lat_gen))
-            if pt.within(self.shape):
-                return self.geolocation_cls(lon=pt.x, lat=pt.y)
-            else:
-                logger.debug(f"Generated point is not within shape. Trying again... [{cnt}/{self.max_tries}]")
+    def _clear_candidates(self):
+        self._candidate_lons = np.empty(0)
+        self._candidate_lats = np.empty(0)
+        self._candidate_hits = np.empty(0, dtype=np.intp)  # indices of candidates inside the shape
+        self._candidate_pos = 0  # index of the next unused candidate
+        self._num_misses = 0  # number of consecutive misses before the next unused candidate
+
+    def _num_candidates_for(self, num):
+        """
+        Return the number of candidates to draw in order to find `num` points inside the shape.
+        """
+        return min(int(num / self.acceptance_ratio * 1.1) + 16, 1_000_000)
+
+    def _draw_candidates(self, num, *, exact):
+        lons = np.asarray(self.lon_gen.next_batch(num, exact=exact), dtype=float)
+        lats = np.asarray(self.lat_gen.next_batch(num, exact=exact), dtype=float)
+        is_inside = shapely.contains_xy(self.shape, lons, lats)
+        return lons, lats, is_inside
+
+    def _raise_max_tries_exceeded(self):
         raise RuntimeError(f"Could not generate point in shape after {self.max_tries} attempts")
 
+    def next_batch_lonlat(self, num, *, exact=True):
+        """
+        Return two NumPy arrays containing the longitudes and latitudes of the next `num` points.
+
+        See `next_batch()` for the meaning of the `exact` argument.
+        """
+        if self.sampling == "triangulation":
+            return self._next_batch_lonlat_triangulation(num)
+
+        if not exact:
+            return self._next_batch_lonlat_inexact(num)
+
+        hit_indices = []
+        num_found = 0
+        while num_found < num:
+            if self._candidate_pos == len(self._candidate_lons):
+                lons, lats, is_inside = self._draw_candidates(self._num_candidates_for(num - num_found), exact=True)
+                self._candidate_lons, self._candidate_lats = lons, lats
+                self._candidate_hits = np.flatnonzero(is_inside)
+                self._candidate_pos = 0
+
+            pos = self._candidate_pos
+            idx = np.searchsorted(self._candidate_hits, pos)
+            hits = self._candidate_hits[idx:idx + num - num_found]
+
+            # Check that no point needs more than `max_tries` attempts (counting
+            # misses carried over from previous blocks and previous calls).
+            misses = np.diff(hits, prepend=pos - 1) - 1
+            if len(hits) > 0:
+                misses[0] += self._num_misses
+                if misses.max() >= self.max_tries:
+                    self._raise_max_tries_exceeded()
+                self._num_misses = 0
+
+            if len(hits) == num - num_found:
+                self._candidate_pos = hits[-1] + 1
+            else:
+                last_hit = hits[-1] if len(hits) > 0 else pos - 1
+                self._num_misses += len(self._candidate_lons) - last_hit - 1
+                self._candidate_pos = len(self._candidate_lons)
+                if self._num_misses >= self.max_tries:
+                    self._raise_max_tries_exceeded()
+
+            hit_indices.append((self._candidate_lons, self._candidate_lats, hits))
+            num_found += len(hits)
+
+        lons = np.concatenate([lons[hits] for lons, _, hits in hit_indices] or [np.empty(0)])
+        lats = np.concatenate([lats[hits] for _, lats, hits in hit_indices] or [np.empty(0)])
+        return lons, lats
+
+    def _next_batch_lonlat_inexact(self, num):
+        all_lons, all_lats = [], []
+        num_found = 0
+        num_misses = 0
+        while num_found < num:
+            lons, lats, is_inside = self._draw_candidates(self._num_candidates_for(num - num_found), exact=False)
+            hits = np.flatnonzero(is_inside)
+            misses = np.diff(hits, append=len(lons), prepend=-1) - 1
+            misses[0] += num_misses
+            # Only the misses before the hits which are actually used are relevant
+            # (plus the trailing misses if the block doesn't contain enough hits).
+            if len(hits) >= num - num_found:
+                misses = misses[:num - num_found]
+            if misses.max() >= self.max_tries:
+                self._raise_max_tries_exceeded()
+            num_misses = misses[-1]
+            all_lons.append(lons[is_inside])
+            all_lats.append(lats[is_inside])
+            num_found += len(all_lons[-1])
+
+        lons = np.concatenate(all_lons or [np.empty(0)])[:num]
+        lats = np.concatenate(all_lats or [np.empty(0)])[:num]
+        return lons, lats
+
+    def _next_batch_lonlat_triangulation(self, num):
+        # Each point uses three random numbers: one to select the triangle (weighted by
+        # area) and two for the position inside it. Reflecting points which fall outside
+        # the triangle (u + v > 1) back inside keeps them uniformly distributed.
+        # A single call to `random()` produces the same numbers as successive calls
+        # for individual points, so the result is the same in exact and inexact mode.
+        r = self.triangle_randgen.random((num, 3))
+        idx = self.triangle_cum_areas.searchsorted(r[:, 0], side='right')
+        u, v = r[:, 1], r[:, 2]
+        outside = u + v > 1
+        u = np.where(outside, 1 - u, u)
+        v = np.where(outside, 1 - v, v)
+        a, b, c = np.moveaxis(self.triangles[idx], 1, 0)
+        points = a + u[:, np.newaxis] * (b - a) + v[:, np.newaxis] * (c - a)
+        return points[:, 0], points[:, 1]
+
+    def __next__(self):
+        if self.sampling == "triangulation":
+            # Same computation as in `_next_batch_lonlat_triangulation()`, but
+            # avoiding the overhead of NumPy array operations for a single point.
+            r, u, v = self.triangle_randgen.random(3).tolist()
+            (ax, ay), (bx, by), (cx, cy) = self.triangles[self.triangle_cum_areas.searchsorted(r, side='right')].tolist()
+            if u + v > 1:
+                u, v = 1 - u, 1 - v
+            return self.geolocation_cls(lon=ax + u * (bx - ax) + v * (cx - ax), lat=ay + u * (by - ay) + v * (cy - ay))
+
+        # Fast path for the common case that the current block contains another hit.
+        idx = self._candidate_hits.searchsorted(self._candidate_pos)
+        if idx < len(self._candidate_hits):
+            hit = int(self._candidate_hits[idx])
+            if hit - self._candidate_pos + self._num_misses < self.max_tries:
+                self._candidate_pos = hit + 1
+                self._num_misses = 0
+                return self.geolocation_cls(lon=float(self._candidate_lons[hit]), lat=float(self._candidate_lats[hit]))
+
+        (lon,), (lat,) = self.next_batch_lonlat(1)
+        return self.geolocation_cls(lon=float(lon), lat=float(lat))
+
+    def next_batch(self, num, *, exact=True):
+        lons, lats = self.next_batch_lonlat(num, exact=exact)
+        return [self.geolocation_cls(lon=lon, lat=lat) for lon, lat in zip(lons.tolist(), lats.tolist())]
+
     def reset(self, seed):
         super().reset(seed)
         self.lon_gen.reset(next(self.seed_generator))
         self.lat_gen.reset(next(self.seed_generator))
+        self.triangle_randgen = np.random.default_rng(next(self.seed_generator))
+        self._clear_candidates()
         return self
 
 
 class GeoJSONGeolocation(PrimitiveGenerator):
     """
     Generator which produces random locations inside a geographic area.
+
+    The `sampling` argument selects how locations inside each feature are
+    produced (see `ShapelyGeolocation`): "rejection" (the default) draws
+    candidate points from the feature's bounding box until one of them is
+    inside the feature, whereas "triangulation" samples a point inside a
+    random triangle of the (pre-computed) triangulation of the feature and
+    always succeeds on the first try.
+
+    If `cache_dir` is given (and the GeoJSON data is read from a file), the
+    preprocessed features are stored in a cache file in this directory and
+    re-used the next time the same file is loaded with the same options (see
+    the `geojson_cache` module). This avoids parsing the GeoJSON file and
+    re-building the shapes, which can be slow for large files.
     """
 
-    def __init__(self, filename_or_geojson_data, include_attributes=None, max_tries=100):
+    # Attributes which are never modified after initialisation. They are
+    # shared with spawned generators (and clones) instead of recomputing them.
+    SHARED_ATTRIBUTES = (
+        "filename", "_geojson_data", "include_attributes", "max_tries", "sampling", "choice_probs", "choice_cdf",
+    )
+
+    def __init__(self, filename_or_geojson_data, include_attributes=None, max_tries=100, sampling="rejection", cache_dir=None):
         super().__init__()
 
         if isinstance(filename_or_geojson_data, str):
-            try:
-                with open(filename_or_geojson_data, 'r') as f:
-                    geojson_data = geojson.load(f)
-            except AttributeError:
-                raise NotImplementedError()
+            self.filename = filename_or_geojson_data
+            self._geojson_data = None  # loaded on demand (see the `geojson_data` property)
         else:
-            geojson_data = filename_or_geojson_data
+            self.filename = None
+            self._geojson_data = filename_or_geojson_data
 
-        self.geojson_data = geojson_data
         self.include_attributes = include_attributes or []
         self.max_tries = max_tries
+        self.sampling = sampling
 
-        self.shape_gens = self._make_shape_generators()
+        if cache_dir is not None and self.filename is not None:
+            self.shape_gens = self._load_or_make_cached_shape_generators(cache_dir)
+        else:
+            self.shape_gens = self._make_shape_generators()
 
         areas = np.array([s.area for s in self.shape_gens])
         self.choice_probs = areas / areas.sum()  # TODO: allow weighin by an arbitrary attribute, not just by area
 
+        # Cumulative distribution used to choose features via binary search. This is computed
+        # in the same way as in `RandomState.choice()` so that the chosen features are the same.
+        self.choice_cdf = self.choice_probs.cumsum()
+        self.choice_cdf /= self.choice_cdf[-1]
+
+        self._init_random_generators()
+
+    def _init_random_generators(self):
         self.seed_generator = SeedGenerator()
         self.shape_gen_chooser = np.random.RandomState()
 
+    @property
+    def geojson_data(self):
+        if self._geojson_data is None:
+            try:
+                with open(self.filename, 'r') as f:
+                    self._geojson_data = geojson.load(f)
+            except AttributeError:
+                raise NotImplementedError()
+        return self._geojson_data
+
+    def _load_or_make_cached_shape_generators(self, cache_dir):
+        cache_filename = get_cache_filename(
+            cache_dir, self.filename, include_attributes=self.include_attributes, sampling=self.sampling
+        )
+
+        if not os.path.exists(cache_filename):
+            shape_gens = self._make_shape_generators()
+            save_preprocessed_features(
+                cache_filename,
+                [g.shape for g in shape_gens],
+                [g.properties for g in shape_gens],
+                triangles=[g.triangles for g in shape_gens] if self.sampling == "triangulation" else None,
+                triangle_cum_areas=[g.triangle_cum_areas for g in shape_gens] if self.sampling == "triangulation" else None,
+            )
+            return shape_gens
+
+        shapes, properties, triangles, triangle_cum_areas = load_preprocessed_features(cache_filename)
+        triangulations = zip(triangles, triangle_cum_areas) if triangles is not None else [None] * len(shapes)
+        return [
+            ShapelyGeolocation._from_preprocessed(
+                shp, props, max_tries=self.max_tries, sampling=self.sampling, triangulation=triangulation
+            )
+            for shp, props, triangulation in zip(shapes, properties, triangulations)
+        ]
+
     def _make_shape_generators(self):
         shape_gens = []
 
@@ -610,22 +1205,51 @@ class GeoJSONGeolocation(PrimitiveGenerator):
                     valid_attributes = list(feature['properties'].keys())
                     raise ValueError(f"Feature does not have attribute '{name}'. Valid attributes are: {valid_attributes}")
 
-            shape_gens.append(ShapelyGeolocation(geom, cur_attributes, max_tries=self.max_tries))
+            shape_gens.append(ShapelyGeolocation(geom, cur_attributes, max_tries=self.max_tries, sampling=self.sampling))
 
         return shape_gens
 
     def spawn(self, spawn_mapping=None):
-        new_obj = GeoJSONGeolocation(self.geojson_data, include_attributes=self.include_attributes, max_tries=self.max_tries)
+        # Rather than re-creating the shapes from the GeoJSON data, the spawned
+        # generator shares them with this one (see `ShapelyGeolocation.spawn()`).
+        new_obj = GeoJSONGeolocation.__new__(GeoJSONGeolocation)
+        PrimitiveGenerator.__init__(new_obj)
+        for name in self.SHARED_ATTRIBUTES:
+            setattr(new_obj, name, getattr(self, name))
+        new_obj.shape_gens = [g._make_spawn_sharing_geometry() for g in self.shape_gens]
+        new_obj._init_random_generators()
         new_obj._set_random_state_from(self)
         return new_obj
 
+    def _choose_shape_gen_indices(self, num=None):
+        return self.choice_cdf.searchsorted(self.shape_gen_chooser.random_sample(num), side='right')
+
     def __next__(self):
-        sg = self.shape_gen_chooser.choice(self.shape_gens, p=self.choice_probs)
+        sg = self.shape_gens[self._choose_shape_gen_indices()]
         return next(sg)
 
+    def next_batch(self, num, *, exact=True):
+        # Choose the features for all items first and then produce the locations
+        # for each feature in a single batch. This gives the same items as calling
+        # `next()` repeatedly because each feature uses its own random generator.
+        indices = self._choose_shape_gen_indices(num)
+
+        # Group the item positions by feature (preserving their order within each group).
+        order = indices.argsort(kind='stable')
+        group_sizes = np.bincount(indices, minlength=len(self.shape_gens))
+
+        items_by_feature = []
+        for idx in np.flatnonzero(group_sizes).tolist():
+            items_by_feature.extend(self.shape_gens[idx].next_batch(int(group_sizes[idx]), exact=exact))
+
+        items = [None] * num
+        for pos, item in zip(order.tolist(), items_by_feature):
+            items[pos] = item
+        return items
+
     def reset(self, seed):
         super().reset(seed)
-        self.shape_gen_chooser.seed(next(self.seed_generator))
+        self.shape_gen_chooser.seed(as_integer_seed(next(self.seed_generator)))
         for g in self.shape_gens:
             g.reset(next(self.seed_generator))
         return self
@@ -683,16 +1307,21 @@ def get_start_and_end_values(start, end, date):
 
 class Timestamp(TohuBaseGenerator):
 
+    supports_batch = True
+
     def __init__(self, *, start=None, end=None, date=None, fmt=None, uppercase=None):
         super().__init__()
         self.start, self.end = get_start_and_end_values(start, end, date)
         self.interval = (self.end - self.start).total_seconds()
         self.offset_randgen = Random()
+        self.np_randgen = np.random.default_rng()
+        self.inexact_offsets = InexactValueStream(self._draw_inexact_offsets)
         self._check_start_before_end()
 
         self.fmt = fmt
         self.uppercase = uppercase
-        self._maybe_format_timestamp = make_timestamp_formatter(self.fmt, self.uppercase)
+        self._timestamp_formatter = None if fmt is None else \
+            TimestampFormatter(fmt, uppercase, start=self.start, interval=self.interval, unit='s')
 
     @property
     def max_value(self):
@@ -702,24 +1331,63 @@ class Timestamp(TohuBaseGenerator):
         if self.start > self.end:
             raise TohuTimestampError(f"Start value must be before end value. Got: start={self.start}, end={self.end}")
 
+    def _draw_inexact_offsets(self, num):
+        return self.np_randgen.integers(0, int(self.interval), size=num, endpoint=True)
+
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        self.exact_mode = exact
+        self.inexact_offsets.clear()
+
     def __next__(self):
-        offset = self.offset_randgen.randint(0, self.interval)
-        ts = self.start + dt.timedelta(seconds=offset)
-        return self._maybe_format_timestamp(ts)
+        if not self.exact_mode:
+            offset = int(self.inexact_offsets.next_value())
+        else:
+            offset = self.offset_randgen.randint(0, self.interval)
+        if self.fmt is None:
+            return self.start + dt.timedelta(seconds=offset)
+        else:
+            return self._timestamp_formatter.format_offset(offset)
+
+    def next_batch(self, num, *, exact=True):
+        if self.start.tzinfo is not None or type(self.start) is not dt.datetime:
+            # The vectorised computation below only produces naive `datetime.datetime`
+            # objects, so for anything else (e.g. a `pd.Timestamp` start value) we fall
+            # back to __next__, which produces values of the same type as `self.start`.
+            return super().next_batch(num, exact=exact)
+
+        if exact and self.exact_mode:
+            randint = self.offset_randgen.randint
+            offsets = np.array([randint(0, self.interval) for _ in range(num)], dtype=np.int64)
+        else:
+            offsets = self.inexact_offsets.next_values(num)
+
+        if self.fmt is None:
+            timestamps = (np.datetime64(self.start, 'us') + offsets.astype('timedelta64[s]')).astype(object)
+        else:
+            timestamps = self._timestamp_formatter.format_offsets(offsets)
+        return timestamps.tolist() if exact else timestamps
 
     def reset(self, seed):
         super().reset(seed)
-        self.offset_randgen.seed(next(self.seed_generator))
+        seed_internal = next(self.seed_generator)
+        self.offset_randgen.seed(as_integer_seed(seed_internal))
+        self.np_randgen = np.random.default_rng(seed_internal)
+        self.inexact_offsets.clear()
         return self
 
     def spawn(self, spawn_mapping=None):
         new_obj = Timestamp(start=self.start, end=self.end, fmt=self.fmt, uppercase=self.uppercase)
         new_obj._set_random_state_from(self)
+        new_obj._timestamp_formatter = self._timestamp_formatter  # share any precomputed formatted values
         return new_obj
 
     def _set_random_state_from(self, other):
         super()._set_random_state_from(other)
         self.offset_randgen.setstate(other.offset_randgen.getstate())
+        self.np_randgen.bit_generator.state = other.np_randgen.bit_generator.state
+        self.exact_mode = other.exact_mode
+        self.inexact_offsets._set_state_from(other.inexact_offsets)
 
     def strftime(self, fmt='%Y-%m-%d %H:%M:%S', uppercase=False):
         g = Timestamp(start=self.start, end=self.end, fmt=fmt, uppercase=uppercase)
@@ -730,40 +1398,78 @@ class Timestamp(TohuBaseGenerator):
 
 class Date(TohuBaseGenerator):
 
+    supports_batch = True
+
     def __init__(self, start, end, *, fmt=None, uppercase=None):
         super().__init__()
         self.start = ensure_is_date_object(start)
         self.end = ensure_is_date_object(end)
         self.interval = (self.end - self.start).days
         self.offset_randgen = Random()
+        self.np_randgen = np.random.default_rng()
+        self.inexact_offsets = InexactValueStream(self._draw_inexact_offsets)
         self._check_start_before_end()
 
         self.fmt = fmt
         self.uppercase = uppercase
-        self._maybe_format_timestamp = make_timestamp_formatter(self.fmt, self.uppercase)
+        self._timestamp_formatter = None if fmt is None else \
+            TimestampFormatter(fmt, uppercase, start=self.start, interval=self.interval, unit='D')
 
     def _check_start_before_end(self):
         if self.start > self.end:
             raise TohuDateError(f"Start value must be before end value. Got: start={self.start}, end={self.end}")
 
+    def _draw_inexact_offsets(self, num):
+        return self.np_randgen.integers(0, self.interval, size=num, endpoint=True)
+
+    def _set_exact_mode(self, exact):
+        super()._set_exact_mode(exact)
+        self.exact_mode = exact
+        self.inexact_offsets.clear()
+
     def __next__(self):
-        offset = self.offset_randgen.randint(0, self.interval)
-        ds = self.start + dt.timedelta(days=offset)
-        return self._maybe_format_timestamp(ds)
+        if not self.exact_mode:
+            offset = int(self.inexact_offsets.next_value())
+        else:
+            offset = self.offset_randgen.randint(0, self.interval)
+        if self.fmt is None:
+            return self.start + dt.timedelta(days=offset)
+        else:
+            return self._timestamp_formatter.format_offset(offset)
+
+    def next_batch(self, num, *, exact=True):
+        if exact and self.exact_mode:
+            randint = self.offset_randgen.randint
+            offsets = np.array([randint(0, self.interval) for _ in range(num)], dtype=np.int64)
+        else:
+            offsets = self.inexact_offsets.next_values(num)
+
+        if self.fmt is None:
+            dates = (np.datetime64(self.start, 'D') + offsets.astype('timedelta64[D]')).astype(object)
+        else:
+            dates = self._timestamp_formatter.format_offsets(offsets)
+        return dates.tolist() if exact else dates
 
     def reset(self, seed):
         super().reset(seed)
-        self.offset_randgen.seed(next(self.seed_generator))
+        seed_internal = next(self.seed_generator)
+        self.offset_randgen.seed(as_integer_seed(seed_internal))
+        self.np_randgen = np.random.default_rng(seed_internal)
+        self.inexact_offsets.clear()
         return self
 
     def spawn(self, spawn_mapping=None):
         new_obj = Date(self.start, self.end, fmt=self.fmt, uppercase=self.uppercase)
         new_obj._set_random_state_from(self)
+        new_obj._timestamp_formatter = self._timestamp_formatter  # share any precomputed formatted values
         return new_obj
 
     def _set_random_state_from(self, other):
         super()._set_random_state_from(other)
         self.offset_randgen.setstate(other.offset_randgen.getstate())
+        self.np_randgen.bit_generator.state = other.np_randgen.bit_generator.state
+        self.exact_mode = other.exact_mode
+        self.inexact_offsets._set_state_from(other.inexact_offsets)
 
     def strftime(self, fmt='%Y-%m-%d', uppercase=False):
         g = Timestamp(start=self.start, end=self.end, fmt=fmt, uppercase=uppercase)
@@ -1,6 +1,6 @@
 from itertools import count
 
-from .base import TohuBaseGenerator, SeedGenerator
+from .base import TohuBaseGenerator, SeedGenerator, SharedValueClone
 from .logging import logger
 from .spawn_mapping import SpawnMapping
 from .utils import is_clone
@@ -17,7 +17,9 @@ class TohuNamespace:
     _global_count = count(start=1)
 
     def __init__(self):
-        self._ns = {}
+        self._ns = {}  # maps generator -> name (None for anonymous generators)
+        self._generators_by_name = {}  # maps name -> first generator added with this name (excluding anonymous ones)
+        self._anonymous_generators = []
         self.seed_generator = SeedGenerator()
         self._idx = next(self._global_count)
 
@@ -65,17 +67,27 @@ class TohuNamespace:
 
     @property
     def named_generators(self):
-        return {name: g for g, name in self._ns.items() if name is not None}
+        return self._generators_by_name.copy()
 
     @property
     def names(self):
-        return [x for x in self._ns.values() if x is not None]
+        return list(self._generators_by_name)
+
+    def _has_name(self, name):
+        return name in self._generators_by_name if name is not None else self._anonymous_generators != []
 
     def __getitem__(self, key):
-        for g, name in self._ns.items():
-            if name == key:
-                return g
-        raise KeyError(f"No generator with name '{key}' exists in this namespace.")
+        try:
+            return self._generators_by_name[key] if key is not None else self._anonymous_generators[0]
+        except (KeyError, IndexError):
+            raise KeyError(f"No generator with name '{key}' exists in this namespace.")
+
+    def _insert(self, g, name):
+        self._ns[g] = name
+        if name is None:
+            self._anonymous_generators.append(g)
+        else:
+            self._generators_by_name.setdefault(name, g)
 
     def _add(self, g, name):
         for g_input in g.input_generators:
@@ -86,7 +98,7 @@ class TohuNamespace:
 
         if g not in self._ns:
             logger.debug(f"Adding generator to {self}: {g} (name='{name}')")
-            self._ns[g] = name
+            self._insert(g, name)
 
     def __setitem__(self, name, g):
         assert isinstance(g, TohuBaseGenerator)
@@ -96,15 +108,15 @@ class TohuNamespace:
                 logger.debug(f"Generator already exists with the same name: {g}. Not adding again.")
             else:
                 logger.debug("Trying to add existing generator with a different name. Adding a clone instead.")
-                self._ns[g.clone()] = name
+                self._insert(g.clone(), name)
         else:
-            if name in self._ns.values():
+            if self._has_name(name):
                 # TODO: is keeping the existing generator and ignoring the new one the right thing to do in all cases?
                 logger.debug(f"A different generator already exists with name '{name}'. Ignoring the new one.")
             else:
                 self._add(g, name)
 
-    def spawn_generator(self, g, spawn_mapping, ns_spawned):
+    def spawn_generator(self, g, spawn_mapping, ns_spawned, *, shared_clones=False):
         logger.debug(f"Spawning generator in {self}: {g}")
         name = self._ns[g]
 
@@ -119,11 +131,17 @@ class TohuNamespace:
                         f"The cloned generator {g} is present in the tohu namespace "
                         f"but its parent {g.parent} is not. This should never happen."
                     )
-                g_new = g.clone()
                 new_parent = spawn_mapping[g.parent]
-                g.unregister_clone(g_new)
-                g_new.register_parent(new_parent)
-                new_parent.register_clone(g_new)
+                if g.is_exact_clone and (shared_clones or isinstance(g, SharedValueClone)):
+                    # Shared-value clones must read from the buffer of the new parent, so we can't re-wire
+                    # a clone of g. This is only possible for exact clones, though; other clones (such as
+                    # the ones created by `Timestamp.strftime()`) are configured differently from their parent.
+                    g_new = new_parent.clone()
+                else:
+                    g_new = g.spawn()
+                    g_new.is_exact_clone = g.is_exact_clone
+                    g_new.register_parent(new_parent)
+                    new_parent.register_clone(g_new)
             else:
                 # Sanity check that all input generators of g have already been spawned before.
                 for g_input in g.input_generators:
@@ -136,6 +154,9 @@ class TohuNamespace:
                 # Simply spawn the generator
                 g_new = g.spawn(spawn_mapping)
 
+            if shared_clones:
+                g_new.use_shared_clones = True
+
             spawn_mapping[g] = g_new
             ns_spawned[name] = g_new
 
@@ -144,11 +165,19 @@ class TohuNamespace:
             # names for constituent generators as the class).
             g_new.set_tohu_name(g.tohu_name)
 
-    def spawn(self):
+    def spawn(self, *, shared_clones=False):
+        """
+        Return a new namespace containing spawned copies of the generators in this one.
+
+        If `shared_clones` is True, clones of the spawned generators (including
+        the ones created by derived generators for their inputs) are shared-value
+        clones which read the elements of the original from a buffer instead of
+        re-computing them (see `SharedValueClone`).
+        """
         spawn_mapping = SpawnMapping()
         ns_spawned = TohuNamespace()
         for g, name in self._ns.items():
-            self.spawn_generator(g, spawn_mapping, ns_spawned)
+            self.spawn_generator(g, spawn_mapping, ns_spawned, shared_clones=shared_clones)
             #ns_spawned[name] = g.spawn()
         return ns_spawned
 
@@ -157,6 +186,11 @@ class TohuNamespace:
         for g in self.all_independent_generators:
             g.reset(next(self.seed_generator))
 
+    def set_exact_mode(self, exact):
+        # Like reset(), this reaches clones via their parents.
+        for g in self.all_independent_generators:
+            g._set_exact_mode(exact)
+
     def _set_random_state_from(self, other):
         # TODO: double-check that this traverses generators in both namespaces in the same order
         for g_self, g_other in zip(self._ns, other._ns):
@@ -1,11 +1,15 @@
 import datetime as dt
+import numpy as np
 import pandas as pd
+import re
 from collections import namedtuple
+from functools import lru_cache
+from itertools import chain
 
 from .._version import get_versions
 
-__all__ = ['ensure_is_date_object', 'ensure_is_datetime_object', 'identity', 'make_timestamp_formatter',
-           'print_generated_sequence', 'parse_date_string', 'parse_datetime_string', 'print_tohu_version']
+__all__ = ['concatenate_columns', 'ensure_is_date_object', 'ensure_is_datetime_object', 'identity', 'make_timestamp_formatter',
+           'make_vectorised_timestamp_formatter', 'print_generated_sequence', 'TimestampFormatter', 'parse_date_string', 'parse_datetime_string', 'print_tohu_version']
 
 
 def print_tohu_version():
@@ -30,6 +34,18 @@ def is_clone(g):
     return g.parent is not None
 
 
+def concatenate_columns(parts):
+    """
+    Concatenate a list of column chunks (as produced by `next_batch()`)
+    into a single column. NumPy arrays are concatenated into a single
+    array, anything else is concatenated into a list.
+    """
+    if parts != [] and all(isinstance(x, np.ndarray) for x in parts):
+        return np.concatenate(parts)
+    else:
+        return list(chain.from_iterable(parts))
+
+
 def make_timestamp_formatter(fmt, uppercase=None):
     if fmt is None:
         formatter = identity
@@ -45,6 +61,194 @@ def make_timestamp_formatter(fmt, uppercase=None):
     return formatter
 
 
+# Timestamp formats which can be produced directly by np.datetime_as_string(), mapping
+# each format to the datetime unit and the separator between date and time (if any).
+ISO_TIMESTAMP_FORMATS = {
+    '%Y': ('Y', None),
+    '%Y-%m': ('M', None),
+    '%Y-%m-%d': ('D', None),
+    '%Y-%m-%dT%H:%M': ('m', 'T'),
+    '%Y-%m-%d %H:%M': ('m', ' '),
+    '%Y-%m-%dT%H:%M:%S': ('s', 'T'),
+    '%Y-%m-%d %H:%M:%S': ('s', ' '),
+}
+
+
+def make_iso_timestamp_formatter(fmt):
+    """
+    Return a function which converts an array of `np.datetime64` values into
+    an array of strings in the given ISO-like format (see ISO_TIMESTAMP_FORMATS).
+    The result is identical to calling `strftime(fmt)` on each element as long
+    as all years are in the range 1000-9999 (NumPy zero-pads years with fewer
+    than four digits, strftime doesn't), so the formatter returns None if any
+    year lies outside this range.
+    """
+    unit, sep = ISO_TIMESTAMP_FORMATS[fmt]
+
+    def format_timestamps(timestamps):
+        if len(timestamps) > 0:
+            years = timestamps.astype('datetime64[Y]').astype(np.int64) + 1970
+            if years.min() < 1000 or years.max() > 9999:
+                return None
+
+        formatted = np.datetime_as_string(timestamps, unit=unit)
+        if sep == ' ':
+            # Replace the 'T' separator between date and time (the character at
+            # position 10) by directly modifying the underlying code points.
+            width = formatted.dtype.itemsize // 4
+            codes = formatted.view(np.uint32).reshape(-1, width)
+            codes[:, 10] = ord(sep)
+        return formatted
+
+    return format_timestamps
+
+
+def make_vectorised_timestamp_formatter(fmt, uppercase=None):
+    """
+    Vectorised version of `make_timestamp_formatter()`.
+
+    Returns a function which accepts an array of `np.datetime64` values and
+    returns an array of the formatted timestamp strings. If `fmt` is None,
+    the timestamps are converted to `datetime.datetime` objects instead (or
+    `datetime.date` objects if the array has unit 'D').
+    """
+    if fmt is None:
+        return lambda timestamps: timestamps.astype(object)
+
+    scalar_formatter = make_timestamp_formatter(fmt, uppercase)
+
+    def format_timestamps_individually(timestamps):
+        return np.array([scalar_formatter(ts) for ts in timestamps.astype(object)], dtype=str)
+
+    if fmt not in ISO_TIMESTAMP_FORMATS:
+        return format_timestamps_individually
+
+    # Note that the output of the ISO formatter doesn't contain any lowercase
+    # letters, so we don't need to take the `uppercase` argument into account.
+    iso_formatter = make_iso_timestamp_formatter(fmt)
+
+    def format_timestamps(timestamps):
+        formatted = iso_formatter(timestamps)
+        if formatted is None:
+            formatted = format_timestamps_individually(timestamps)
+        return formatted
+
+    return format_timestamps
+
+
+# Timestamp formatters precompute all possible formatted values if there are at most
+# this many of them; otherwise they cache recently formatted values in an LRU cache.
+MAX_FORMATTER_LOOKUP_TABLE_SIZE = 10_000
+FORMATTER_LRU_CACHE_SIZE = 10_000
+
+# strftime directives whose output only depends on the date (not the time of day)
+DATE_FORMAT_DIRECTIVES = set('aAbBCdDeFgGhjmuUVwWxyY%')
+
+
+def is_date_only_format(fmt):
+    """
+    Return True if the format string `fmt` only contains strftime
+    directives which depend on the date but not on the time of day.
+    """
+    return all(directive in DATE_FORMAT_DIRECTIVES for directive in re.findall('%(.)', fmt))
+
+
+class TimestampFormatter:
+    """
+    Formatter for timestamps (or dates) of the form `start + offset * unit`,
+    where `offset` is an integer in the range 0 <= offset <= interval.
+
+    Since the number of distinct formatted values is often small (e.g. for dates
+    within a single year) these are precomputed when the formatter is first used,
+    so that formatting simply becomes a lookup by offset. If the format only depends
+    on the date, timestamps are looked up by day rather than by offset. If there are
+    too many distinct values to precompute, formatted values are cached instead.
+    """
+
+    def __init__(self, fmt, uppercase=None, *, start, interval, unit):
+        """
+        Parameters
+        ----------
+        fmt: string
+            Format string used to format the timestamps.
+        uppercase: bool
+            If True, convert the formatted strings to uppercase.
+        start: dt.datetime or dt.date
+            Start value (corresponding to offset 0).
+        interval: integer
+            Largest possible offset.
+        unit: string
+            Either 's' (offsets are in seconds) or 'D' (offsets are in days).
+        """
+        if unit not in ('s', 'D'):
+            raise ValueError(f"Argument 'unit' must be 's' or 'D'. Got: '{unit}'")
+
+        self.fmt = fmt
+        self.uppercase = uppercase
+        self.start = start
+        self.unit = unit
+        self._format_scalar = make_timestamp_formatter(fmt, uppercase)
+        self._format_vectorised = make_vectorised_timestamp_formatter(fmt, uppercase)
+        self._lookup_table = None
+
+        if unit == 's' and is_date_only_format(fmt):
+            # Look up formatted values by day. The key for a given offset is the number
+            # of days between midnight on the start date and the resulting timestamp.
+            self.key_base = start.replace(hour=0, minute=0, second=0, microsecond=0)
+            self.key_shift = int((start - self.key_base).total_seconds())
+            self.key_divisor = 24 * 60 * 60
+            self.key_unit = dt.timedelta(days=1)
+        else:
+            self.key_base = start
+            self.key_shift = 0
+            self.key_divisor = 1
+            self.key_unit = dt.timedelta(seconds=1) if unit == 's' else dt.timedelta(days=1)
+
+        self.num_keys = self._get_key(int(interval)) + 1
+        self.use_lookup_table = (self.num_keys <= MAX_FORMATTER_LOOKUP_TABLE_SIZE)
+        self._format_key_cached = lru_cache(maxsize=FORMATTER_LRU_CACHE_SIZE)(self._format_key)
+
+    def _get_key(self, offset):
+        return (self.key_shift + offset) // self.key_divisor
+
+    def _format_key(self, key):
+        return self._format_scalar(self.key_base + key * self.key_unit)
+
+    @property
+    def lookup_table(self):
+        if self._lookup_table is None:
+            self._lookup_table = np.array([self._format_key(key) for key in range(self.num_keys)], dtype=str)
+        return self._lookup_table
+
+    def format_offset(self, offset):
+        """
+        Return the formatted value of the timestamp `start + offset * unit`.
+        """
+        key = self._get_key(offset)
+        if self.use_lookup_table:
+            return self.lookup_table.item(key)
+        else:
+            return self._format_key_cached(key)
+
+    def format_offsets(self, offsets):
+        """
+        Return array with the formatted values of the timestamps `start + offsets * unit`.
+        """
+        keys = self._get_key(offsets)
+        if self.use_lookup_table:
+            return self.lookup_table[keys]
+        elif self.fmt in ISO_TIMESTAMP_FORMATS:
+            if self.unit == 's':
+                timestamps = np.datetime64(self.start, 'us') + offsets.astype('timedelta64[s]')
+            else:
+                timestamps = np.datetime64(self.start, 'D') + offsets.astype('timedelta64[D]')
+            return self._format_vectorised(timestamps)
+        else:
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            unique_values = np.array([self._format_key_cached(key) for key in unique_keys.tolist()], dtype=str)
+            return unique_values[inverse]
+
+
 def make_exploded_column(df, colname_new, colname_old):
     """
     Internal helper function used by `explode_columns()`.
@@ -1,3 +1,4 @@
+from ...items_class_cache import get_items_class
 from ..base import SeedGenerator, TohuBaseGenerator
 from .tohu_items_class import make_tohu_items_class
 
@@ -5,10 +6,11 @@ from .tohu_items_class import make_tohu_items_class
 class TohuNamespace:
     def __init__(self, tohu_items_cls_name):
         self._ns = {}
+        self._name_by_parent = {}  # maps parent generator -> name of the first field generator cloned from it
         self.gens_to_reset = {}
         self.seed_generator = SeedGenerator()
         self.tohu_items_cls_name = tohu_items_cls_name
-        self.tohu_items_cls = self._get_updated_tohu_items_class()
+        self._tohu_items_cls = None  # created on demand (see `tohu_items_cls`)
 
     def __getitem__(self, name):
         return self._ns[name]
@@ -32,28 +34,46 @@ class TohuNamespace:
         return self._ns.copy()
 
     def find_existing_name(self, generator):
+        return self._name_by_parent.get(generator)
+
+    def _update_name_by_parent(self):
+        self._name_by_parent = {}
         for name, g in self._ns.items():
-            if generator is g.parent:
-                return name
-        return None
+            self._name_by_parent.setdefault(g.parent, name)
 
     def add_field_generator(self, name, gen):
         existing_name = self.find_existing_name(gen)
+        is_replacing_field = name in self._ns
         if existing_name is None:
             self._ns[name] = gen.clone()
             self.gens_to_reset[name] = True
         else:
             self._ns[name] = self._ns[existing_name].clone()
             self.gens_to_reset[name] = False
-        self.tohu_items_cls = self._get_updated_tohu_items_class()
+
+        if is_replacing_field:
+            # The replaced generator may have been the first clone of its parent, so rebuild the index.
+            self._update_name_by_parent()
+        else:
+            self._name_by_parent.setdefault(self._ns[name].parent, name)
+
+        self._tohu_items_cls = None
 
     def update_from_dict(self, the_dict):
         for name, gen in the_dict.items():
             if isinstance(gen, TohuBaseGenerator):
                 self.add_field_generator(name, gen)
 
+    @property
+    def tohu_items_cls(self):
+        # The items class is only created when it is needed (rather than every time
+        # a field generator is added), so that adding many fields stays cheap.
+        if self._tohu_items_cls is None:
+            self._tohu_items_cls = self._get_updated_tohu_items_class()
+        return self._tohu_items_cls
+
     def _get_updated_tohu_items_class(self):
-        return make_tohu_items_class(self.tohu_items_cls_name, self.field_names)
+        return get_items_class('tohu.v7', self.tohu_items_cls_name, self.field_names, make_tohu_items_class)
 
     def reset(self, seed):
         self.seed_generator.reset(seed)